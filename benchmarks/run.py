@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+"""
+Benchmarks for the django-passwords validators.
+
+Runs offline against synthetic word lists and reports, for every validator,
+dictionary size and password length: latency percentiles, throughput, peak
+RSS and dictionary load time. Results are written as JSON so two revisions
+can be compared:
+
+    python benchmarks/run.py --output before.json
+    git checkout other-revision
+    python benchmarks/run.py --output after.json --compare before.json
+"""
+from __future__ import division, print_function
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from timeit import default_timer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from django.conf import settings  # noqa: E402
+
+if not settings.configured:
+    settings.configure(
+        SECRET_KEY="benchmarks",
+        PASSWORD_COMPLEXITY={"UPPER": 1, "LOWER": 1, "DIGITS": 1,
+                             "SPECIAL": 1, "WORDS": 1},
+    )
+
+import django  # noqa: E402
+
+django.setup()
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+DEFAULT_LENGTHS = [6, 8, 12, 16, 32, 64, 128]
+ALPHABET = string.ascii_letters + string.digits + string.punctuation
+
+
+def make_wordlist(path, size, seed):
+    rng = random.Random(seed)
+    with open(path, "w") as f:
+        for _ in range(size):
+            length = min(max(int(rng.gauss(8, 2.5)), 3), 20)
+            f.write("".join(rng.choice(string.ascii_lowercase)
+                            for _ in range(length)))
+            f.write("\n")
+
+
+def make_passwords(words, length, count, seed):
+    """
+    Half random strings, half built from dictionary words with a few
+    substitutions, so both the accept and the reject paths are exercised.
+    """
+    rng = random.Random(seed)
+    passwords = []
+    for i in range(count):
+        if i % 2:
+            password = "".join(rng.choice(ALPHABET) for _ in range(length))
+        else:
+            password = ""
+            while len(password) < length:
+                password += rng.choice(words)
+            password = list(password[:length])
+            for _ in range(max(1, length // 10)):
+                password[rng.randrange(length)] = rng.choice(ALPHABET)
+            password = "".join(password)
+        passwords.append(password)
+    return passwords
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+def time_calls(func, passwords):
+    from django.core.exceptions import ValidationError
+
+    timings = []
+    rejected = 0
+    started = default_timer()
+    for password in passwords:
+        t0 = default_timer()
+        try:
+            func(password)
+        except ValidationError:
+            rejected += 1
+        timings.append(default_timer() - t0)
+    elapsed = default_timer() - started
+    timings.sort()
+    return {
+        "samples": len(timings),
+        "rejected": rejected,
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p90_ms": percentile(timings, 0.90) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "max_ms": timings[-1] * 1000,
+        "throughput_per_s": len(timings) / elapsed if elapsed else None,
+    }
+
+
+def bench_dictionary(path, size, lengths, samples, seed, compiled):
+    """
+    Runs in a fresh process per dictionary so peak RSS is attributable.
+    """
+    from passwords import validators
+    from passwords.similarity import SimilarityIndex
+
+    if compiled:
+        compiled_path = path + ".idx"
+        with open(path) as f:
+            SimilarityIndex.from_haystacks(
+                line.strip() for line in f).save(compiled_path)
+        path = compiled_path
+
+    t0 = default_timer()
+    dictionary = validators.DictionaryValidator(dictionary=path)
+    dictionary.get_index()
+    load_seconds = default_timer() - t0
+
+    words = list(dictionary.get_index().words[:1000])
+    sequences = validators.CommonSequenceValidator(
+        validators.COMMON_SEQUENCES)
+    sequences.get_index()
+    complexity = validators.ComplexityValidator(settings.PASSWORD_COMPLEXITY)
+    haystacks = words[:200]
+
+    def fuzzy(password):
+        for haystack in haystacks:
+            sequences.fuzzy_substring(password, haystack)
+
+    benches = [
+        ("DictionaryValidator", dictionary),
+        ("CommonSequenceValidator", sequences),
+        ("ComplexityValidator", complexity),
+        ("fuzzy_substring", fuzzy),
+    ]
+
+    results = []
+    for length in lengths:
+        passwords = make_passwords(words, length, samples, seed + length)
+        for name, func in benches:
+            result = time_calls(func, passwords)
+            result.update({
+                "validator": name,
+                "dictionary_size": size,
+                "password_length": length,
+                "compiled": compiled,
+                "load_seconds": load_seconds if name == "DictionaryValidator"
+                else None,
+            })
+            results.append(result)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        peak *= 1024
+    for result in results:
+        result["peak_rss_bytes"] = peak
+    return results
+
+
+def revision():
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.STDOUT).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    def key(result):
+        return (result["validator"], result["dictionary_size"],
+                result["password_length"], result.get("compiled", False))
+
+    before = dict((key(r), r) for r in baseline["results"])
+    print("%-24s %9s %6s %11s %11s %8s" % (
+        "validator", "words", "length", "p50 before", "p50 after", "ratio"))
+    for result in results["results"]:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        ratio = result["p50_ms"] / old["p50_ms"] if old["p50_ms"] else 0
+        print("%-24s %9d %6d %9.3fms %9.3fms %7.2fx" % (
+            result["validator"], result["dictionary_size"],
+            result["password_length"], old["p50_ms"], result["p50_ms"],
+            ratio))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated dictionary sizes.")
+    parser.add_argument("--lengths",
+                        default=",".join(map(str, DEFAULT_LENGTHS)),
+                        help="Comma-separated password lengths.")
+    parser.add_argument("--samples", type=int, default=50,
+                        help="Passwords per validator and length.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compiled", action="store_true",
+                        help="Load dictionaries in the compiled format.")
+    parser.add_argument("--output", help="Write JSON results here.")
+    parser.add_argument("--compare", metavar="JSON",
+                        help="Print p50 ratios against earlier results.")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    lengths = [int(l) for l in args.lengths.split(",")]
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+
+    tmpdir = tempfile.mkdtemp()
+    results = []
+    try:
+        for size in sizes:
+            path = os.path.join(tmpdir, "words-%d.txt" % size)
+            make_wordlist(path, size, args.seed)
+            pool = context.Pool(1, maxtasksperchild=1)
+            try:
+                results.extend(pool.apply(bench_dictionary, (
+                    path, size, lengths, args.samples, args.seed,
+                    args.compiled)))
+            finally:
+                pool.close()
+                pool.join()
+            print("benchmarked %d words" % size, file=sys.stderr)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    output = {
+        "meta": {
+            "revision": revision(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "seed": args.seed,
+            "samples": args.samples,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2, sort_keys=True)
+    else:
+        json.dump(output, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(output, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
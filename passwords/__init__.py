@@ -13,3 +13,12 @@ def get_version():
 
 
 __version__ = get_version()
+
+try:
+    import django
+except ImportError:  # while setup.py reads the version
+    django = None
+
+# Found automatically from Django 3.2.
+if django is not None and django.VERSION < (3, 2):
+    default_app_config = "passwords.apps.PasswordsConfig"
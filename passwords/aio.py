@@ -0,0 +1,65 @@
+"""
+Asyncio support for the validators, behind their ``avalidate()`` methods.
+
+Similarity scans are CPU-bound, so they run on a small thread pool instead
+of the event loop, and a per-loop semaphore caps how many wait on it at
+once. Cancelling the awaiting coroutine also stops the scan in its thread.
+"""
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+PASSWORD_ASYNC_WORKERS = getattr(
+    settings, "PASSWORD_ASYNC_WORKERS", 4)
+PASSWORD_ASYNC_CONCURRENCY = getattr(
+    settings, "PASSWORD_ASYNC_CONCURRENCY", 16)
+
+_executor = None
+_executor_lock = threading.Lock()
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                PASSWORD_ASYNC_WORKERS,
+                thread_name_prefix="passwords-validator")
+        return _executor
+
+
+def _get_semaphore():
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(
+            PASSWORD_ASYNC_CONCURRENCY)
+    return semaphore
+
+
+async def run_in_executor(func, value):
+    """
+    Await ``func(value, cancel)`` on the shared executor, where ``cancel``
+    is a ``threading.Event`` set if this coroutine is cancelled.
+    """
+    cancel = threading.Event()
+    async with _get_semaphore():
+        future = asyncio.get_running_loop().run_in_executor(
+            get_executor(), func, value, cancel)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+
+async def run_inline(validator, value):
+    """
+    Await a validator cheap enough to run on the event loop itself.
+    """
+    return validator(value)
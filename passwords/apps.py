@@ -0,0 +1,36 @@
+import gc
+
+from django.apps import AppConfig
+from django.core.exceptions import ImproperlyConfigured
+
+
+class PasswordsConfig(AppConfig):
+    """
+    Loads the dictionaries and other data the default validators need
+    according to PASSWORD_DICTIONARY_LOAD:
+
+    ``"lazy"``
+        On first use, in whichever process and thread validates first.
+    ``"eager"``
+        When Django starts, so the first request doesn't pay for it.
+    ``"preload"``
+        When Django starts, then moves everything loaded so far out of the
+        garbage collector's reach. Use it with servers that import the
+        project before forking workers, such as ``gunicorn --preload``, so
+        the workers keep sharing those pages copy-on-write.
+    """
+    name = "passwords"
+    verbose_name = "Passwords"
+
+    def ready(self):
+        from . import validators
+
+        strategy = validators.PASSWORD_DICTIONARY_LOAD
+        if strategy not in ("lazy", "eager", "preload"):
+            raise ImproperlyConfigured(
+                "PASSWORD_DICTIONARY_LOAD must be 'lazy', 'eager' or "
+                "'preload', not %r." % (strategy,))
+        if strategy != "lazy":
+            validators.preload()
+        if strategy == "preload" and hasattr(gc, "freeze"):
+            gc.freeze()
@@ -1,6 +1,36 @@
 from django.conf import settings
-from django.utils.translation import ugettext_lazy as _
-from . import validators
+from django.utils.translation import gettext_lazy as _
+from . import policy, validators
+
+
+class LengthValidator(object):
+    """
+    Wrapper for validators.LengthValidator which is compatible
+    with the Django 1.9+ password validation API. ``min_length`` and
+    ``max_length`` may be set in ``OPTIONS`` and default to
+    PASSWORD_MIN_LENGTH and PASSWORD_MAX_LENGTH.
+    """
+
+    def __init__(self, min_length=None, max_length=None):
+        if min_length is None and max_length is None:
+            self.validator = validators.validate_length
+        else:
+            if min_length is None:
+                min_length = validators.PASSWORD_MIN_LENGTH
+            if max_length is None:
+                max_length = validators.PASSWORD_MAX_LENGTH
+            self.validator = validators.shared_validator(
+                validators.LengthValidator, min_length=min_length,
+                max_length=max_length)
+
+    def get_help_text(self):
+        return _("Your password fails to meet our length requirements.")
+
+    def validate(self, value, user=None):
+        return self.validator(value)
+
+    def avalidate(self, value, user=None):
+        return self.validator.avalidate(value)
 
 
 class ComplexityValidator(object):
@@ -17,3 +47,126 @@ class ComplexityValidator(object):
 
     def validate(self, value, user=None):
         return self.validator(value)
+
+    def avalidate(self, value, user=None):
+        return self.validator.avalidate(value)
+
+
+class DictionaryValidator(object):
+    """
+    Wrapper for validators.DictionaryValidator which is compatible
+    with the Django 1.9+ password validation API. ``OPTIONS`` are passed
+    to it; without any, the checks share the ``dictionary_words``
+    validator PasswordField uses, and instances with the same options
+    share one loaded dictionary.
+    """
+
+    def __init__(self, **options):
+        if options:
+            self.validator = validators.shared_validator(
+                validators.DictionaryValidator, **options)
+        else:
+            self.validator = validators.dictionary_words
+
+    def get_help_text(self):
+        return _("Your password can't be based on a dictionary word.")
+
+    def validate(self, value, user=None):
+        return self.validator(value)
+
+    def avalidate(self, value, user=None):
+        return self.validator.avalidate(value)
+
+
+class CommonSequenceValidator(object):
+    """
+    Wrapper for validators.CommonSequenceValidator which is compatible
+    with the Django 1.9+ password validation API. ``OPTIONS`` are passed
+    to it; without any, the checks share the ``common_sequences``
+    validator PasswordField uses.
+    """
+
+    def __init__(self, **options):
+        if options:
+            options.setdefault("haystacks",
+                               validators.PASSWORD_COMMON_SEQUENCES)
+            self.validator = validators.shared_validator(
+                validators.CommonSequenceValidator, **options)
+        else:
+            self.validator = validators.common_sequences
+
+    def get_help_text(self):
+        return _("Your password can't be based on a common sequence of "
+                 "characters.")
+
+    def validate(self, value, user=None):
+        return self.validator(value)
+
+    def avalidate(self, value, user=None):
+        return self.validator.avalidate(value)
+
+
+class StrengthValidator(object):
+    """
+    Wrapper for validators.StrengthValidator which is compatible
+    with the Django 1.9+ password validation API. ``OPTIONS`` such as
+    ``min_score`` are passed to it.
+    """
+
+    def __init__(self, **options):
+        self.validator = validators.shared_validator(
+            validators.StrengthValidator, **options)
+
+    def get_help_text(self):
+        return _("Your password must not be easy to guess.")
+
+    def validate(self, value, user=None):
+        return self.validator(value)
+
+    def avalidate(self, value, user=None):
+        return self.validator.avalidate(value)
+
+
+class UserAttributeSimilarityValidator(object):
+    """
+    Wrapper for validators.UserAttributeSimilarityValidator which is
+    compatible with the Django 1.9+ password validation API. ``OPTIONS``
+    such as ``attributes`` and ``threshold`` are passed to it.
+    """
+
+    def __init__(self, **options):
+        self.validator = validators.shared_validator(
+            validators.UserAttributeSimilarityValidator, **options)
+
+    def get_help_text(self):
+        return _("Your password can't be too similar to your other personal "
+                 "information.")
+
+    def validate(self, value, user=None):
+        return self.validator.for_user(user)(value)
+
+    def avalidate(self, value, user=None):
+        return self.validator.for_user(user).avalidate(value)
+
+
+class PasswordPolicyValidator(object):
+    """
+    Runs the same checks as PasswordField, cheapest first, through the
+    Django 1.9+ password validation API. ``short_circuit`` may be set in
+    ``OPTIONS``.
+    """
+
+    def __init__(self, short_circuit=None):
+        if short_circuit is None:
+            self.policy = policy.default_policy
+        else:
+            self.policy = policy.PasswordPolicy(short_circuit=short_circuit)
+
+    def get_help_text(self):
+        return _("Your password fails to meet our password policy.")
+
+    def validate(self, value, user=None):
+        return self.policy(value)
+
+    def avalidate(self, value, user=None):
+        return self.policy.avalidate(value)
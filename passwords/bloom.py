@@ -0,0 +1,96 @@
+# coding=utf-8
+from __future__ import division, unicode_literals
+
+import math
+import mmap
+import os
+import struct
+
+
+BLOOM_MAGIC = b"DJPWBLOM"
+BLOOM_VERSION = 1
+# magic, version, number of hashes, number of bits
+BLOOM_HEADER = struct.Struct("<8sIIQ")
+
+_FNV_PRIME = 16777619
+_FNV_BASIS = 2166136261
+# Second seed for double hashing; any odd constant other than the basis.
+_FNV_BASIS2 = 0x5bd1e995
+
+
+def fnv_hashes(value):
+    """
+    Two 32-bit FNV-1a hashes of ``value``'s UTF-8 encoding with different
+    seeds. FNV is simple enough to reimplement wherever the filter is read.
+    """
+    h1, h2 = _FNV_BASIS, _FNV_BASIS2
+    for byte in bytearray(value.encode("utf-8")):
+        h1 = ((h1 ^ byte) * _FNV_PRIME) & 0xffffffff
+        h2 = ((h2 ^ byte) * _FNV_PRIME) & 0xffffffff
+    return h1, h2 | 1
+
+
+class BloomFilter(object):
+    """
+    Bloom filter over strings. A negative answer is always right; a
+    positive one is wrong with roughly ``error_rate`` probability once
+    ``capacity`` strings have been added, so callers confirm hits.
+    """
+
+    def __init__(self, num_bits, num_hashes, bits=None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        if bits is None:
+            bits = bytearray((num_bits + 7) // 8)
+        self.bits = bits
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate):
+        capacity = max(capacity, 1)
+        num_bits = int(math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2))
+        num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+        return cls(max(num_bits, 8), num_hashes)
+
+    @classmethod
+    def from_words(cls, words, error_rate):
+        if not hasattr(words, "__len__"):
+            words = list(words)
+        bloom = cls.for_capacity(len(words), error_rate)
+        for word in words:
+            bloom.add(word)
+        return bloom
+
+    def _positions(self, value):
+        h1, h2 = fnv_hashes(value)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        bits = self.bits
+        for position in self._positions(value):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, num_hashes, num_bits = BLOOM_HEADER.unpack_from(
+            data, 0)
+        if magic != BLOOM_MAGIC or version != BLOOM_VERSION:
+            raise ValueError("%s is not a compiled bloom filter" % path)
+        return cls(num_bits, num_hashes, memoryview(data)[BLOOM_HEADER.size:])
+
+    def save(self, path):
+        tmp = "%s.tmp%d" % (path, os.getpid())
+        with open(tmp, "wb") as f:
+            f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, BLOOM_VERSION,
+                                      self.num_hashes, self.num_bits))
+            f.write(bytes(self.bits))
+        os.rename(tmp, path)
@@ -0,0 +1,195 @@
+# coding=utf-8
+from __future__ import unicode_literals
+
+import binascii
+import hashlib
+import heapq
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+
+from django.utils.encoding import force_bytes
+
+
+BREACH_MAGIC = b"DJPWBRCH"
+BREACH_VERSION = 1
+# magic, version, bytes kept per hash, number of hashes
+BREACH_HEADER = struct.Struct("<8sIIQ")
+# Hashes are bucketed by their first two bytes; the table holds the index
+# of the first hash in each bucket.
+BREACH_PREFIXES = 1 << 16
+BREACH_TABLE = struct.Struct("<%dQ" % (BREACH_PREFIXES + 1))
+# Most sorted runs merged at once, to stay well clear of open-file limits.
+MERGE_FAN_IN = 64
+
+
+def password_hash(value, hash_bytes=20):
+    return hashlib.sha1(force_bytes(value)).digest()[:hash_bytes]
+
+
+class BreachCorpus(object):
+    """
+    Memory-mapped, sorted list of (possibly truncated) SHA-1 hashes of
+    breached passwords, as written by ``compile_corpus``.
+
+    A lookup reads the two prefix-table entries for the hash's first two
+    bytes and binary-searches the few thousand hashes between them, so it
+    touches a handful of pages however large the corpus is.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.hash_bytes, self.count = \
+            BREACH_HEADER.unpack_from(self.data, 0)
+        if magic != BREACH_MAGIC or version != BREACH_VERSION:
+            raise ValueError("%s is not a compiled breach corpus" % path)
+        self.records = BREACH_HEADER.size + BREACH_TABLE.size
+
+    def __len__(self):
+        return self.count
+
+    def _prefix_bound(self, prefix):
+        offset = BREACH_HEADER.size + prefix * 8
+        return struct.unpack_from("<Q", self.data, offset)[0]
+
+    def _record(self, i):
+        start = self.records + i * self.hash_bytes
+        return self.data[start:start + self.hash_bytes]
+
+    def contains_hash(self, digest):
+        digest = digest[:self.hash_bytes]
+        prefix = struct.unpack(">H", digest[:2])[0]
+        lo, hi = self._prefix_bound(prefix), self._prefix_bound(prefix + 1)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self._record(mid)
+            if record < digest:
+                lo = mid + 1
+            elif record > digest:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def __contains__(self, value):
+        return self.contains_hash(password_hash(value, self.hash_bytes))
+
+
+_corpora = {}
+_corpora_lock = threading.Lock()
+
+
+def get_corpus(path):
+    """
+    The ``BreachCorpus`` at ``path``, opened once per process.
+    """
+    with _corpora_lock:
+        corpus = _corpora.get(path)
+        if corpus is None:
+            corpus = _corpora[path] = BreachCorpus(path)
+        return corpus
+
+
+def _parse_hashes(lines, hash_bytes):
+    # Accepts HIBP-style "HEX:COUNT" lines as well as bare hex digests.
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        digest = binascii.unhexlify(line.split(b":", 1)[0])
+        if len(digest) < 2:
+            raise ValueError("Hash too short: %r" % line)
+        yield digest[:hash_bytes]
+
+
+def _read_run(path, hash_bytes):
+    with open(path, "rb") as f:
+        while True:
+            record = f.read(hash_bytes)
+            if not record:
+                return
+            yield record
+
+
+def _merge_runs(runs, hash_bytes):
+    previous = None
+    for record in heapq.merge(*[_read_run(run, hash_bytes) for run in runs]):
+        if record != previous:
+            previous = record
+            yield record
+
+
+def compile_corpus(lines, output, hash_bytes=20, chunk_size=1000000,
+                   fan_in=MERGE_FAN_IN):
+    """
+    Write the hex SHA-1 hashes in ``lines`` (bytes, one per line) to
+    ``output`` in the format read by ``BreachCorpus``, keeping only the
+    first ``hash_bytes`` bytes of each. The input need not be sorted: it is
+    sorted in runs of ``chunk_size`` hashes spilled to temporary files and
+    merged at most ``fan_in`` runs at a time, so memory and open files stay
+    bounded whatever the input size. Returns the number of distinct hashes
+    written.
+    """
+    if not 2 <= hash_bytes <= 20:
+        raise ValueError("hash_bytes must be between 2 and 20")
+    tmpdir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output)))
+    try:
+        runs = []
+        chunk = []
+        for digest in _parse_hashes(lines, hash_bytes):
+            chunk.append(digest)
+            if len(chunk) >= chunk_size:
+                runs.append(_write_run(tmpdir, len(runs), chunk))
+                chunk = []
+        if chunk or not runs:
+            runs.append(_write_run(tmpdir, len(runs), chunk))
+
+        generation = 0
+        while len(runs) > fan_in:
+            generation += 1
+            merged = []
+            for start in range(0, len(runs), fan_in):
+                group = runs[start:start + fan_in]
+                path = os.path.join(tmpdir, "merge%d-%d" % (generation,
+                                                            len(merged)))
+                with open(path, "wb") as f:
+                    for record in _merge_runs(group, hash_bytes):
+                        f.write(record)
+                for run in group:
+                    os.remove(run)
+                merged.append(path)
+            runs = merged
+
+        bounds = [0] * (BREACH_PREFIXES + 1)
+        count = 0
+        tmp = os.path.join(tmpdir, "corpus")
+        with open(tmp, "wb") as f:
+            f.seek(BREACH_HEADER.size + BREACH_TABLE.size)
+            for record in _merge_runs(runs, hash_bytes):
+                f.write(record)
+                bounds[struct.unpack(">H", record[:2])[0] + 1] += 1
+                count += 1
+
+            for prefix in range(BREACH_PREFIXES):
+                bounds[prefix + 1] += bounds[prefix]
+            f.seek(0)
+            f.write(BREACH_HEADER.pack(BREACH_MAGIC, BREACH_VERSION,
+                                       hash_bytes, count))
+            f.write(BREACH_TABLE.pack(*bounds))
+        os.rename(tmp, output)
+        return count
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def _write_run(tmpdir, number, chunk):
+    chunk.sort()
+    path = os.path.join(tmpdir, "run%d" % number)
+    with open(path, "wb") as f:
+        for record in chunk:
+            f.write(record)
+    return path
@@ -0,0 +1,99 @@
+# coding=utf-8
+from __future__ import unicode_literals
+
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.encoding import force_bytes
+
+
+PASSWORD_VERDICT_CACHE_SIZE = getattr(
+    settings, "PASSWORD_VERDICT_CACHE_SIZE", 0)
+PASSWORD_VERDICT_CACHE_TTL = getattr(
+    settings, "PASSWORD_VERDICT_CACHE_TTL", 60)
+
+_MISSING = object()
+# Returned by a validate callable whose pass must not be remembered; errors
+# are left out with a false ``cacheable`` attribute.
+UNCACHED = object()
+
+
+class VerdictCache(object):
+    """
+    Short-lived LRU cache of validator verdicts, so a password checked by
+    the form, then by AUTH_PASSWORD_VALIDATORS, then again on a re-submit
+    is only scanned once.
+
+    Entries are keyed by an HMAC of the validator configuration and the
+    password under ``SECRET_KEY``; the password itself is never stored.
+    Only the verdict is kept: nothing for a pass, or the message, code and
+    params of the ``ValidationError`` to raise again. Disabled when
+    ``max_size`` is 0.
+    """
+
+    def __init__(self, max_size=None, ttl=None):
+        if max_size is None:
+            max_size = PASSWORD_VERDICT_CACHE_SIZE
+        if ttl is None:
+            ttl = PASSWORD_VERDICT_CACHE_TTL
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, config, value):
+        return hmac.new(force_bytes(settings.SECRET_KEY),
+                        force_bytes(config) + b"\0" + force_bytes(value),
+                        hashlib.sha256).digest()
+
+    def check(self, config, value, validate):
+        """
+        Run ``validate(value)`` unless a verdict for ``config`` and
+        ``value`` is cached, raising the cached error if there is one.
+        Verdicts from a degraded check, marked as described for
+        ``UNCACHED``, are not cached.
+        """
+        if not self.max_size:
+            return validate(value)
+
+        key = self.key(config, value)
+        verdict = self._get(key)
+        if verdict is _MISSING:
+            try:
+                result = validate(value)
+            except ValidationError as e:
+                if getattr(e, "cacheable", True):
+                    self._set(key, (e.message, e.code, e.params))
+                raise
+            if result is not UNCACHED:
+                self._set(key, None)
+        elif verdict is not None:
+            message, code, params = verdict
+            raise ValidationError(message, code=code, params=params)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] < time.time():
+                return _MISSING
+            self._entries[key] = entry
+            return entry[1]
+
+    def _set(self, key, verdict):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + self.ttl, verdict)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+verdicts = VerdictCache()
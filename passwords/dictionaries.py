@@ -0,0 +1,220 @@
+# coding=utf-8
+from __future__ import unicode_literals
+
+import bz2
+import glob
+import gzip
+import io
+import lzma
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from .similarity import NORMALIZE_UNICODE, SimilarityIndex, is_compiled
+
+
+PASSWORD_DICTIONARY_CACHE_SIZE = getattr(
+    settings, "PASSWORD_DICTIONARY_CACHE_SIZE", 256 * 1024 * 1024)
+PASSWORD_DICTIONARY_RELOAD_INTERVAL = getattr(
+    settings, "PASSWORD_DICTIONARY_RELOAD_INTERVAL", 5)
+PASSWORD_DICTIONARY_ENCODING = getattr(
+    settings, "PASSWORD_DICTIONARY_ENCODING", "utf-8")
+PASSWORD_DICTIONARY_MIN_WORD_LENGTH = getattr(
+    settings, "PASSWORD_DICTIONARY_MIN_WORD_LENGTH", 1)
+
+_OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
+
+
+def dictionary_key(paths):
+    """
+    Hashable form of a dictionary setting, which is a path or glob or a
+    list of them.
+    """
+    if isinstance(paths, (list, tuple)):
+        return tuple(paths)
+    return paths
+
+
+def expand_paths(paths):
+    """
+    The files named by a path or glob, or a list of them, in order.
+    """
+    if not isinstance(paths, (list, tuple)):
+        paths = [paths]
+    files = []
+    for pattern in paths:
+        if glob.has_magic(pattern):
+            files.extend(sorted(glob.glob(pattern)))
+        else:
+            files.append(pattern)
+    return files
+
+
+def open_word_list(path, encoding=None):
+    """
+    Open a word list for reading text, decompressing ``.gz``, ``.bz2`` and
+    ``.xz`` files on the fly. Undecodable bytes are replaced rather than
+    failing the whole list.
+    """
+    if encoding is None:
+        encoding = PASSWORD_DICTIONARY_ENCODING
+    opener = _OPENERS.get(os.path.splitext(path)[1].lower())
+    if opener is None:
+        return io.open(path, encoding=encoding, errors="replace")
+    return opener(path, "rt", encoding=encoding, errors="replace")
+
+
+def iter_words(paths, encoding=None, min_length=None):
+    """
+    Stream the words of every word list in ``paths`` one line at a time,
+    skipping those shorter than ``min_length``. Nothing is deduplicated
+    here: ``SimilarityIndex.from_haystacks`` dedupes normalized words as it
+    consumes them, so only the final word set is ever held in memory.
+    """
+    if min_length is None:
+        min_length = PASSWORD_DICTIONARY_MIN_WORD_LENGTH
+    for path in expand_paths(paths):
+        with open_word_list(path, encoding) as f:
+            for line in f:
+                word = line.strip()
+                if len(word) >= min_length:
+                    yield word
+
+
+def load_dictionary(paths, normalization=NORMALIZE_UNICODE):
+    """
+    Build a ``SimilarityIndex`` for the dictionary at ``paths``: the output
+    of compile_password_dictionary, which records its own normalization,
+    or any number of plain or compressed word lists, normalized with
+    ``normalization``. A glob matching no files is a configuration error
+    rather than an empty dictionary that lets every password through.
+    """
+    files = expand_paths(paths)
+    if not files:
+        raise ImproperlyConfigured("No word lists match %r." % (paths,))
+    if len(files) == 1 and is_compiled(files[0]):
+        return SimilarityIndex.load(files[0])
+    return SimilarityIndex.from_haystacks(iter_words(files), normalization)
+
+
+def index_size(index):
+    """
+    Rough number of bytes of process memory held by an in-memory index.
+    """
+    size = sum(sys.getsizeof(word) for word in index.words)
+    size += sys.getsizeof(index.words)
+    for table in (index.gram_offsets, index.postings):
+        size += len(table) * table.itemsize
+    return size
+
+
+class _Entry(object):
+
+    def __init__(self, index, stat, size):
+        self.index = index
+        self.stat = stat
+        self.size = size
+        self.checked = time.time()
+
+
+class DictionaryRegistry(object):
+    """
+    Process-wide cache of loaded dictionaries keyed by path and the
+    normalization plain word lists are loaded with.
+
+    Every validator asking for the same path shares one index. A path is
+    re-stat()ed at most every ``reload_interval`` seconds and reloaded when
+    its mtime or size changed, so replacing a word list takes effect without
+    restarting workers. When the loaded dictionaries add up to more than
+    ``max_size`` bytes the least recently used ones are dropped; a compiled
+    dictionary counts as its file size, since its pages live in the page
+    cache, and every index also counts its caches of match masks and code
+    points.
+    """
+
+    def __init__(self, max_size=None, reload_interval=None):
+        if max_size is None:
+            max_size = PASSWORD_DICTIONARY_CACHE_SIZE
+        if reload_interval is None:
+            reload_interval = PASSWORD_DICTIONARY_RELOAD_INTERVAL
+        self.max_size = max_size
+        self.reload_interval = reload_interval
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, path, normalization=NORMALIZE_UNICODE):
+        path = dictionary_key(path)
+        key = (path, normalization)
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.time()
+            if entry is not None and now - entry.checked >= self.reload_interval:
+                entry.checked = now
+                if self._stat(path) != entry.stat:
+                    entry = None
+            if entry is None:
+                entry = self._load(path, normalization)
+            else:
+                self._entries.pop(key)
+            self._entries[key] = entry
+            self._evict(keep=key)
+            return entry.index
+
+    def forget(self, path=None):
+        """
+        Drop ``path`` from the registry, or every dictionary if omitted.
+        """
+        path = dictionary_key(path)
+        with self._lock:
+            for key in list(self._entries):
+                if path is None or key[0] == path:
+                    del self._entries[key]
+
+    def __contains__(self, path):
+        path = dictionary_key(path)
+        return any(key[0] == path for key in self._entries)
+
+    @property
+    def size(self):
+        # Match masks and code points are private to the process even for
+        # compiled dictionaries, so they are counted on top of the loaded
+        # size.
+        return sum(entry.size + entry.index.cache_nbytes
+                   for entry in self._entries.values())
+
+    def _stat(self, path):
+        # Globs are expanded again, so adding a file reloads too.
+        stats = []
+        for name in expand_paths(path):
+            st = os.stat(name)
+            stats.append((name, st.st_mtime, st.st_size))
+        return tuple(stats)
+
+    def _load(self, path, normalization):
+        stat = self._stat(path)
+        index = load_dictionary(path, normalization)
+        if isinstance(index.postings, memoryview):
+            size = sum(st[2] for st in stat)
+        else:
+            size = index_size(index)
+        return _Entry(index, stat, size)
+
+    def _evict(self, keep):
+        total = self.size
+        for key in list(self._entries):
+            if total <= self.max_size:
+                break
+            if key != keep:
+                entry = self._entries.pop(key)
+                total -= entry.size + entry.index.cache_nbytes
+
+
+registry = DictionaryRegistry()
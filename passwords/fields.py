@@ -1,18 +1,34 @@
+from django.conf import settings
 from django.forms import CharField, PasswordInput
+from django.shortcuts import resolve_url
+from django.templatetags.static import static
+from django.utils.functional import lazy
 from django.utils.translation import gettext_lazy as _
 
-from passwords.validators import (validate_length, common_sequences,
-                                  dictionary_words, complexity,
-                                  PASSWORD_MIN_LENGTH, PASSWORD_MAX_LENGTH)
+from passwords.policy import default_policy
+from passwords.validators import PASSWORD_MIN_LENGTH, PASSWORD_MAX_LENGTH
+
+PASSWORD_POLICY_ASSET = getattr(settings, "PASSWORD_POLICY_ASSET", None)
+PASSWORD_LIVE_VALIDATION_URL = getattr(
+    settings, "PASSWORD_LIVE_VALIDATION_URL", None)
+
+
+class PasswordPolicyInput(PasswordInput):
+    """
+    PasswordInput that checks passwords in the browser against the policy
+    exported by the export_password_policy management command, found at
+    the URL in its ``data-password-policy`` attribute, and as they are
+    typed against the ``passwords.views.validate_password`` view at the URL
+    in its ``data-password-live`` attribute.
+    """
+
+    class Media:
+        js = ("passwords/password-policy.js",)
 
 
 class PasswordField(CharField):
 
-    default_validators = [
-        validate_length,
-        common_sequences,
-        dictionary_words,
-        complexity]
+    default_validators = [default_policy]
 
     def __init__(self, *args, **kwargs):
         if 'widget' not in kwargs:
@@ -33,6 +49,24 @@ class PasswordField(CharField):
             if PASSWORD_MAX_LENGTH:
                 attrs['maxlength'] = PASSWORD_MAX_LENGTH
 
-            kwargs["widget"] = PasswordInput(render_value=False, attrs=attrs)
+            # Both URLs are resolved when the widget is rendered rather than
+            # while forms are being imported, before the asset may have been
+            # exported and collected or the URLconf loaded.
+            if PASSWORD_POLICY_ASSET:
+                # Resolved through the staticfiles storage, so a manifest
+                # storage serves it under a content-hashed, cacheable URL.
+                attrs['data-password-policy'] = lazy(static, str)(
+                    PASSWORD_POLICY_ASSET)
+            if PASSWORD_LIVE_VALIDATION_URL:
+                # A URL name or path.
+                attrs['data-password-live'] = lazy(resolve_url, str)(
+                    PASSWORD_LIVE_VALIDATION_URL)
+
+            if PASSWORD_POLICY_ASSET or PASSWORD_LIVE_VALIDATION_URL:
+                kwargs["widget"] = PasswordPolicyInput(render_value=False,
+                                                       attrs=attrs)
+            else:
+                kwargs["widget"] = PasswordInput(render_value=False,
+                                                 attrs=attrs)
 
         super(PasswordField, self).__init__(*args, **kwargs)
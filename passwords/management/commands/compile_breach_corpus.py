@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from passwords.breach import compile_corpus
+
+
+class Command(BaseCommand):
+    help = ("Converts a text dump of SHA-1 password hashes, such as the "
+            "Pwned Passwords list, into the memory-mapped format that "
+            "PASSWORD_BREACH_CORPUS can point at.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Text file with one hex SHA-1 "
+                                           "hash per line, optionally "
+                                           "followed by ':count'.")
+        parser.add_argument("output", help="Where to write the corpus.")
+        parser.add_argument(
+            "--hash-bytes", type=int, default=20,
+            help="Bytes of each hash to keep; fewer bytes make a smaller "
+                 "file with more false positives. Defaults to 20.")
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000000,
+            help="Hashes sorted in memory at a time. Defaults to 1000000.")
+
+    def handle(self, *args, **options):
+        with open(options["source"], "rb") as f:
+            count = compile_corpus(f, options["output"],
+                                   hash_bytes=options["hash_bytes"],
+                                   chunk_size=options["chunk_size"])
+        self.stdout.write("Wrote %d hashes to %s" % (count, options["output"]))
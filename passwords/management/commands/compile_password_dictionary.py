@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from passwords.bloom import BloomFilter
+from passwords.dictionaries import (PASSWORD_DICTIONARY_ENCODING,
+                                    PASSWORD_DICTIONARY_MIN_WORD_LENGTH,
+                                    expand_paths, iter_words)
+from passwords.similarity import (NORMALIZE_LEETSPEAK, NORMALIZE_UNICODE,
+                                 SimilarityIndex)
+from passwords.validators import (PASSWORD_DICTIONARY,
+                                  PASSWORD_DICTIONARY_BLOOM_ERROR_RATE,
+                                  PASSWORD_DICTIONARY_LEETSPEAK)
+
+
+class Command(BaseCommand):
+    help = ("Compiles a word list into the memory-mapped format that "
+            "PASSWORD_DICTIONARY can point at.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Where to write the compiled dictionary.")
+        parser.add_argument(
+            "--source", nargs="+", default=PASSWORD_DICTIONARY,
+            help="Word lists with one word per line, optionally compressed "
+                 "with gzip, bzip2 or xz; globs are expanded. Defaults to "
+                 "PASSWORD_DICTIONARY.")
+        parser.add_argument(
+            "--encoding", default=PASSWORD_DICTIONARY_ENCODING,
+            help="Encoding of the word lists. Defaults to "
+                 "PASSWORD_DICTIONARY_ENCODING.")
+        parser.add_argument(
+            "--min-length", type=int,
+            default=PASSWORD_DICTIONARY_MIN_WORD_LENGTH,
+            help="Skip words shorter than this. Defaults to "
+                 "PASSWORD_DICTIONARY_MIN_WORD_LENGTH.")
+        parser.add_argument(
+            "--bloom", metavar="PATH",
+            help="Also write a Bloom filter of the words to PATH, for "
+                 "PASSWORD_DICTIONARY_BLOOM.")
+        parser.add_argument(
+            "--bloom-error-rate", type=float,
+            default=PASSWORD_DICTIONARY_BLOOM_ERROR_RATE,
+            help="False-positive rate of the Bloom filter.")
+        parser.add_argument(
+            "--leetspeak", action="store_true",
+            default=PASSWORD_DICTIONARY_LEETSPEAK,
+            help="Undo leetspeak substitutions in the words, and in passwords "
+                 "checked against them. Defaults to "
+                 "PASSWORD_DICTIONARY_LEETSPEAK.")
+
+    def handle(self, *args, **options):
+        source = options["source"]
+        if not source:
+            raise CommandError("No word list given and PASSWORD_DICTIONARY "
+                               "is not set.")
+
+        if options["leetspeak"]:
+            normalization = NORMALIZE_LEETSPEAK
+        else:
+            normalization = NORMALIZE_UNICODE
+        files = expand_paths(source)
+        if not files:
+            raise CommandError("No word lists match %s." % (source,))
+        index = SimilarityIndex.from_haystacks(
+            iter_words(files, options["encoding"], options["min_length"]),
+            normalization)
+        index.save(options["output"])
+        if options["bloom"]:
+            BloomFilter.from_words(index.words,
+                                   options["bloom_error_rate"]).save(
+                options["bloom"])
+
+        self.stdout.write("Compiled %d words from %s into %s" % (
+            len(index), ", ".join(files), options["output"]))
@@ -0,0 +1,30 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from passwords import policy
+from passwords.validators import PASSWORD_DICTIONARY_BLOOM_ERROR_RATE
+
+
+class Command(BaseCommand):
+    help = ("Exports the checks PasswordField runs as a JSON file that "
+            "PASSWORD_POLICY_ASSET can point at, so browsers can reject "
+            "obviously weak passwords before submitting them.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "output", help="Where to write the policy, usually under one of "
+                           "STATICFILES_DIRS.")
+        parser.add_argument(
+            "--bloom-error-rate", type=float,
+            default=PASSWORD_DICTIONARY_BLOOM_ERROR_RATE,
+            help="False-positive rate of the dictionary's Bloom filter; "
+                 "higher rates make a smaller file.")
+
+    def handle(self, *args, **options):
+        exported = policy.default_policy.export(options["bloom_error_rate"])
+        with open(options["output"], "w") as f:
+            json.dump(exported, f, sort_keys=True, separators=(",", ":"))
+        self.stdout.write("Wrote policy %s with %d rules to %s" % (
+            exported["digest"][:12], len(exported["rules"]),
+            options["output"]))
@@ -0,0 +1,155 @@
+# coding=utf-8
+from __future__ import unicode_literals
+
+import base64
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.encoding import force_str
+from django.utils.translation import gettext as _
+
+from .bloom import BloomFilter
+from .similarity import LEETSPEAK, NORMALIZE_LEETSPEAK, NormalizedPassword
+from .validators import (PASSWORD_DICTIONARY_BLOOM_ERROR_RATE,
+                         CommonSequenceValidator, ComplexityValidator,
+                         DictionaryValidator, LengthValidator,
+                         default_validators)
+
+
+PASSWORD_POLICY_SHORT_CIRCUIT = getattr(
+    settings, "PASSWORD_POLICY_SHORT_CIRCUIT", False)
+
+# Bumped whenever the layout of ``PasswordPolicy.export`` changes.
+POLICY_EXPORT_VERSION = 1
+
+
+class PasswordPolicy(object):
+    """
+    Runs a chain of validators as one, cheapest first by their ``cost``,
+    normalizing the password once for all of them.
+
+    With ``short_circuit`` the first failing check ends validation, so an
+    expensive dictionary scan never runs for a password that is already
+    too short; otherwise every check runs and all of their errors are
+    collected.
+    """
+
+    def __init__(self, validators=None, short_circuit=None):
+        if validators is None:
+            validators = default_validators
+        if short_circuit is None:
+            short_circuit = PASSWORD_POLICY_SHORT_CIRCUIT
+        # sorted() is stable, so checks of equal cost keep their order.
+        self.validators = sorted(validators,
+                                 key=lambda v: getattr(v, "cost", 1))
+        self.short_circuit = short_circuit
+
+    def __call__(self, value):
+        errors = self.errors(value)
+        if errors:
+            raise ValidationError(errors)
+
+    def errors(self, value, scans=None):
+        """
+        Return the list of ``ValidationError`` raised for ``value``. For a
+        password being typed, pass the same dict as ``scans`` on every
+        keystroke: similarity checks keep their rows in it and only score
+        the characters added since the last call.
+        """
+        value = NormalizedPassword(value)
+        errors = []
+        for validator in self.validators:
+            try:
+                if scans is not None and hasattr(validator,
+                                                 "validate_incremental"):
+                    validator.validate_incremental(value, scans)
+                else:
+                    validator(value)
+            except ValidationError as e:
+                errors.append(e)
+                if self.short_circuit:
+                    break
+        return errors
+
+    async def avalidate(self, value):
+        value = NormalizedPassword(value)
+        errors = []
+        for validator in self.validators:
+            try:
+                if hasattr(validator, "avalidate"):
+                    await validator.avalidate(value)
+                else:
+                    validator(value)
+            except ValidationError as e:
+                errors.append(e)
+                if self.short_circuit:
+                    break
+        if errors:
+            raise ValidationError(errors)
+
+    def export(self, bloom_error_rate=None):
+        """
+        Describe the checks a browser can repeat as a JSON-serializable
+        dict: length and complexity rules, the common sequences and a Bloom
+        filter of the dictionary, with the messages in the active language.
+        Checks that need server-side data, such as breached passwords, are
+        left out; the server still validates every submission.
+        """
+        if bloom_error_rate is None:
+            bloom_error_rate = PASSWORD_DICTIONARY_BLOOM_ERROR_RATE
+        rules = []
+        for validator in self.validators:
+            if isinstance(validator, LengthValidator):
+                rules.append({
+                    "type": "length",
+                    "min_length": validator.min_length,
+                    "max_length": validator.max_length,
+                    "min_message": force_str(validator.message % (
+                        _("Must be %s characters or more") %
+                        validator.min_length)),
+                    "max_message": force_str(validator.message % (
+                        _("Must be %s characters or less") %
+                        validator.max_length)),
+                })
+            elif isinstance(validator, ComplexityValidator):
+                if validator.complexities:
+                    rules.append({
+                        "type": "complexity",
+                        "complexities": validator.complexities,
+                        "message": _("Your password fails to meet our "
+                                     "complexity requirements."),
+                    })
+            elif isinstance(validator, CommonSequenceValidator):
+                rules.append({
+                    "type": "common_sequence",
+                    "sequences": list(validator.haystacks),
+                    "min_run": validator.min_run,
+                    "message": force_str(validator.message),
+                })
+            elif isinstance(validator, DictionaryValidator):
+                index = validator.get_index()
+                if not len(index):
+                    continue
+                bloom = BloomFilter.from_words(index.words, bloom_error_rate)
+                rule = {
+                    "type": "dictionary_word",
+                    "num_bits": bloom.num_bits,
+                    "num_hashes": bloom.num_hashes,
+                    "bits": base64.b64encode(bytes(bloom.bits)).decode(
+                        "ascii"),
+                    "leetspeak": {},
+                    "message": force_str(validator.message),
+                }
+                if index.normalization == NORMALIZE_LEETSPEAK:
+                    rule["leetspeak"] = LEETSPEAK
+                rules.append(rule)
+
+        policy = {"version": POLICY_EXPORT_VERSION, "rules": rules}
+        content = json.dumps(policy, sort_keys=True).encode("utf-8")
+        policy["digest"] = hashlib.sha256(content).hexdigest()
+        return policy
+
+
+default_policy = PasswordPolicy()
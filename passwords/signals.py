@@ -0,0 +1,18 @@
+from django.dispatch import Signal
+
+
+# Sent after a validator has checked a password, when anything is connected.
+# Arguments: validator, elapsed and load_elapsed (seconds), scanned and
+# pruned (haystacks scored and skipped by a similarity validator), code
+# (the rejection code, or None if the password passed), cached (True when
+# the verdict came from the verdict cache, in which case nothing was scanned)
+# and degraded (True when a budget ran out and the verdict came from the
+# budget policy). Receivers are called with send_robust(); their errors are
+# logged.
+validation_finished = Signal()
+
+# Sent when a similarity scan runs out of its time or work budget, before
+# the budget policy decides the verdict. Arguments: validator, elapsed
+# (seconds), scanned (haystacks scored so far) and policy ("accept",
+# "reject" or "exact").
+budget_exhausted = Signal()
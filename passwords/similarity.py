@@ -0,0 +1,629 @@
+# coding=utf-8
+from __future__ import division, unicode_literals
+
+import mmap
+import os
+import struct
+import sys
+import unicodedata
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
+from itertools import count
+
+
+GRAM_SIZE = 3
+GRAM_BUCKETS = 1 << 16
+
+COMPILED_MAGIC = b"DJPWDICT"
+COMPILED_VERSION = 2
+# magic, version, byte order, words, lengths, gram size, gram buckets, blob,
+# normalization; version 1 files lack the last field and were lowercased.
+COMPILED_HEADER = struct.Struct("<8s8I")
+COMPILED_HEADER_V1 = struct.Struct("<8s7I")
+
+# Normalizations applied to haystacks and needles alike. LOWER is what
+# version 1 of the compiled format used; UNICODE applies NFKC and
+# casefolds, and LEETSPEAK additionally undoes common substitutions.
+NORMALIZE_LOWER = 0
+NORMALIZE_UNICODE = 1
+NORMALIZE_LEETSPEAK = 2
+
+LEETSPEAK = {
+    "@": "a", "4": "a", "8": "b", "(": "c", "3": "e", "6": "g", "1": "i",
+    "!": "i", "0": "o", "$": "s", "5": "s", "7": "t", "+": "t", "2": "z",
+}
+_LEETSPEAK_TABLE = dict((ord(k), v) for k, v in LEETSPEAK.items())
+
+# Match masks are kept for this many recently scored words per index.
+MASK_CACHE_SIZE = 4096
+
+_tokens = count()
+
+
+def gram_bucket(gram):
+    """
+    Map a q-gram onto one of ``GRAM_BUCKETS`` posting lists. crc32 is used
+    rather than ``hash()`` so the mapping is stable across processes.
+    """
+    return zlib.crc32(gram.encode("utf-8")) & (GRAM_BUCKETS - 1)
+
+
+def _normalize(value, normalization):
+    if normalization == NORMALIZE_LOWER:
+        return value.lower()
+    value = unicodedata.normalize("NFKC", value).casefold()
+    if normalization == NORMALIZE_LEETSPEAK:
+        value = value.translate(_LEETSPEAK_TABLE)
+    return value
+
+
+class NormalizedPassword(str):
+    """
+    A password remembering its normalized forms, so the checks run on it by
+    a ``PasswordPolicy`` share one normalization instead of each redoing it.
+    """
+
+    def normalized(self, normalization=NORMALIZE_UNICODE):
+        forms = self.__dict__.setdefault("_forms", {})
+        if normalization not in forms:
+            forms[normalization] = _normalize(str(self), normalization)
+        return forms[normalization]
+
+
+def normalize(value, normalization=NORMALIZE_UNICODE):
+    """
+    The form of ``value`` that similarity checks compare against haystacks
+    normalized the same way.
+    """
+    if isinstance(value, NormalizedPassword):
+        return value.normalized(normalization)
+    return _normalize(value, normalization)
+
+
+def haystack_masks(haystack):
+    """
+    Per-character match masks for the bit-parallel engine: bit ``j`` of
+    ``masks[c]`` is set when ``haystack[j] == c``.
+    """
+    masks = {}
+    for j, c in enumerate(haystack):
+        masks[c] = masks.get(c, 0) | (1 << j)
+    return masks
+
+
+def masks_size(masks):
+    """
+    Approximate bytes held by a dict from ``haystack_masks``.
+    """
+    return sys.getsizeof(masks) + sum(sys.getsizeof(c) + sys.getsizeof(bits)
+                                      for c, bits in masks.items())
+
+
+def substring_distance(needle, haystack, masks=None, limit=None):
+    """
+    Smallest number of edits turning ``needle`` into some substring of
+    ``haystack``; both are expected to be normalized already.
+
+    This is the dynamic program ``fuzzy_substring`` always computed, run
+    with Myers/Hyyrö bit-parallelism: a row of the matrix is kept as two
+    bit vectors of +1/-1 differences along the haystack, and each needle
+    character advances the whole row with a handful of integer operations.
+    ``masks`` may be passed in from ``haystack_masks`` to avoid rebuilding
+    them. When ``limit`` is given, scoring stops as soon as the distance is
+    known to exceed it and ``limit + 1`` is returned instead.
+    """
+    m, n = len(needle), len(haystack)
+
+    if m == 1:
+        if needle not in haystack:
+            return -1
+    if n == 0:
+        return m
+
+    if masks is None:
+        masks = haystack_masks(haystack)
+    full = (1 << n) - 1
+    vp = vn = 0
+    for i, c in enumerate(needle):
+        eq = masks.get(c, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | (~(xh | vp) & full)
+        hn = vp & xh
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (~(xv | hp) & full)
+        vn = hp & xv
+        # No cell in this row is lower than its first cell minus every
+        # decrement along it, and later rows never go below this row.
+        if limit is not None and i + 1 - bin(vn).count("1") > limit:
+            return limit + 1
+
+    best = row_minimum(vp, vn, m, n)
+    if limit is not None and best > limit:
+        return limit + 1
+    return best
+
+
+def row_minimum(vp, vn, m, n):
+    """
+    Smallest cell of the row for a needle of length ``m`` kept as the bit
+    vectors ``vp`` and ``vn`` along a haystack of length ``n``.
+    """
+    score = best = m
+    for j in range(n):
+        if (vp >> j) & 1:
+            score += 1
+        elif (vn >> j) & 1:
+            score -= 1
+            if score < best:
+                best = score
+    return best
+
+
+def char_mask(haystack, c):
+    """
+    ``haystack_masks(haystack).get(c, 0)`` without building the others.
+    """
+    eq = 0
+    j = haystack.find(c)
+    while j >= 0:
+        eq |= 1 << j
+        j = haystack.find(c, j + 1)
+    return eq
+
+
+class IncrementalScan(object):
+    """
+    ``substring_distance`` from a needle typed one character at a time to
+    the words of a ``SimilarityIndex``. The bit-parallel row of each word is
+    kept between characters, so each one typed costs a single row per word
+    instead of rescoring the whole needle.
+
+    Rows are only kept for the words the q-gram filter lets through for
+    any continuation of the needle, and only once the needle is long enough
+    for it to filter every length bucket: ``seed`` does nothing before
+    that, and ``extends`` tells whether ``find`` can answer for a needle or
+    the caller has to scan normally and seed again. Rows never go down as
+    the needle grows, so words whose row has passed the most edits they
+    could ever be allowed are dropped for good.
+
+    ``check``, when given, is called with the number of rows advanced so
+    far and may raise to abandon the work; the scan is then left unseeded.
+    """
+
+    def __init__(self, index, threshold):
+        self.index = index
+        self.threshold = threshold
+        self.reset()
+
+    def reset(self):
+        self.needle = ""
+        self.ids = None
+        self.vp = self.vn = None
+
+    def extends(self, needle):
+        return self.ids is not None and needle.startswith(self.needle)
+
+    def seed(self, needle, check=None):
+        """
+        Keep rows for the normalized ``needle`` if the q-gram filter
+        narrows down the words any continuation of it can match.
+        """
+        self.reset()
+        m = len(needle)
+        n_grams = m - GRAM_SIZE + 1
+        for length, start, stop, k in self.index.limits(m, self.threshold,
+                                                        ahead=True):
+            if n_grams - k * GRAM_SIZE <= 0:
+                return
+        ids = self.index.candidates(needle, self.threshold, ahead=True)
+        self.ids = ids
+        self.vp = [0] * len(ids)
+        self.vn = [0] * len(ids)
+        try:
+            work = 0
+            for c in needle:
+                work = self.advance(c, check, work)
+        except Exception:
+            self.reset()
+            raise
+
+    def advance(self, c, check=None, work=0):
+        m = len(self.needle) + 1
+        words, ids, vps, vns = self.index.words, self.ids, self.vp, self.vn
+        kept = 0
+        for k in range(len(ids)):
+            if check is not None:
+                check(work)
+            work += 1
+            i = ids[k]
+            haystack = words[i]
+            n = len(haystack)
+            full = (1 << n) - 1
+            vp, vn = vps[k], vns[k]
+            # The step of substring_distance.
+            eq = char_mask(haystack, c) if c in haystack else 0
+            xv = eq | vn
+            xh = (((eq & vp) + vp) ^ vp) | eq
+            hp = vn | (~(xh | vp) & full)
+            hn = vp & xh
+            hp = ((hp << 1) | 1) & full
+            hn = (hn << 1) & full
+            vp = hn | (~(xv | hp) & full)
+            vn = hp & xv
+            longest, edits = max_reach(n, self.threshold)
+            if m > longest or m - bin(vn).count("1") > edits:
+                continue
+            ids[kept], vps[kept], vns[kept] = i, vp, vn
+            kept += 1
+        del ids[kept:], vps[kept:], vns[kept:]
+        self.needle += c
+        return work
+
+    def find(self, needle, check=None):
+        """
+        The first word, in index order, that the normalized ``needle``, an
+        extension of the last one, is ``threshold``-similar to, or None;
+        the same word a full scan finds.
+        """
+        try:
+            work = 0
+            for c in needle[len(self.needle):]:
+                work = self.advance(c, check, work)
+        except Exception:
+            self.reset()
+            raise
+        m = len(needle)
+        for k, i in enumerate(self.ids):
+            haystack = self.index.words[i]
+            n = len(haystack)
+            limit = max_distance(m, n, self.threshold)
+            vn = self.vn[k]
+            if limit < 0 or m - bin(vn).count("1") > limit:
+                continue
+            if row_minimum(self.vp[k], vn, m, n) <= limit:
+                return haystack
+        return None
+
+
+def is_compiled(path):
+    """
+    Whether ``path`` holds an index written by ``SimilarityIndex.save``.
+    """
+    with open(path, "rb") as f:
+        return f.read(len(COMPILED_MAGIC)) == COMPILED_MAGIC
+
+
+class CompiledWords(object):
+    """
+    Read-only sequence of the words in a compiled index, decoded from the
+    memory-mapped blob on access.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode(
+            "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class SequenceAutomaton(object):
+    """
+    Finds runs of at least ``min_run`` characters taken, forwards or
+    backwards, from any of a set of sequences. Every pattern has the same
+    length, so the automaton reduces to a set of all ``min_run``-character
+    windows of the sequences and their reversals, and detection is one
+    left-to-right pass over the needle with a hash probe per position.
+    """
+
+    def __init__(self, sequences, min_run):
+        self.min_run = min_run
+        windows = set()
+        for sequence in sequences:
+            sequence = normalize(sequence)
+            for seq in (sequence, sequence[::-1]):
+                for i in range(len(seq) - min_run + 1):
+                    windows.add(seq[i:i + min_run])
+        self.windows = frozenset(windows)
+
+    def find(self, needle):
+        """
+        Return the first run in the normalized ``needle``, or None.
+        """
+        k = self.min_run
+        for i in range(len(needle) - k + 1):
+            if needle[i:i + k] in self.windows:
+                return needle[i:i + k]
+        return None
+
+
+def max_distance(m, n, threshold):
+    """
+    Largest edit distance between a needle of length ``m`` and a haystack of
+    length ``n`` that still reaches ``threshold`` similarity, or -1 if none
+    does. Uses the exact expression from ``BaseSimilarityValidator`` so the
+    pruning never disagrees with the final check.
+    """
+    longest = max(m, n)
+    d = min(m, int(longest * (1 - threshold)) + 1)
+    while d >= 0 and (longest - d) / longest < threshold:
+        d -= 1
+    return d
+
+
+_reaches = {}
+
+
+def max_reach(n, threshold):
+    """
+    ``(longest needle, most edits)`` with which a needle, or any longer
+    one, can still reach ``threshold`` similarity against a haystack of
+    length ``n``; both unbounded for a threshold of 0 or less.
+    """
+    key = (n, threshold)
+    if key not in _reaches:
+        if threshold <= 0:
+            reach = (float("inf"), float("inf"))
+        else:
+            # Past n a needle needs at least m - n edits while the edits
+            # allowed grow with m, so the last m allowing them is the
+            # longest and most lenient.
+            m = n
+            while max_distance(m + 1, n, threshold) >= m + 1 - n:
+                m += 1
+            reach = (m, max_distance(m, n, threshold))
+        _reaches[key] = reach
+    return _reaches[key]
+
+
+class SimilarityIndex(object):
+    """
+    Candidate filter over a fixed set of haystacks.
+
+    Haystacks are normalized once, deduplicated and sorted by (length, word) so
+    each length forms a contiguous range of word ids. A hashed q-gram
+    inverted index maps every q-gram onto the ids of the words containing
+    it. A needle can only be within ``k`` edits of a substring of a word if
+    at least ``m - q + 1 - k * q`` of its q-grams occur in that word, so
+    only words passing both the length bound and the q-gram count are
+    handed back for scoring.
+    """
+
+    def __init__(self, words, lengths, gram_offsets, postings,
+                 normalization=NORMALIZE_UNICODE):
+        self.words = words
+        self.normalization = normalization
+        self.lengths = lengths
+        self.gram_offsets = gram_offsets
+        self.postings = postings
+        self._starts = [start for _, start, _ in lengths]
+        # Bounded LRU so a long-running worker does not end up holding
+        # private masks for the whole dictionary.
+        self._masks = OrderedDict()
+        self.masks_nbytes = 0
+        # Code point arrays for the NumPy backend, see passwords.vectorized.
+        self.matrices = None
+        # Unique for the life of the process, unlike id(), so caches can
+        # tell a reloaded dictionary from the one it replaced.
+        self.token = next(_tokens)
+
+    @classmethod
+    def from_haystacks(cls, haystacks, normalization=NORMALIZE_UNICODE):
+        words = sorted(set(_normalize(h, normalization) for h in haystacks),
+                       key=lambda w: (len(w), w))
+
+        lengths = []
+        buckets = {}
+        for i, word in enumerate(words):
+            if not lengths or lengths[-1][0] != len(word):
+                if lengths:
+                    lengths[-1][2] = i
+                lengths.append([len(word), i, i])
+            for bucket in set(gram_bucket(word[j:j + GRAM_SIZE])
+                              for j in range(len(word) - GRAM_SIZE + 1)):
+                buckets.setdefault(bucket, []).append(i)
+        if lengths:
+            lengths[-1][2] = len(words)
+
+        gram_offsets = array("I", [0] * (GRAM_BUCKETS + 1))
+        postings = array("I")
+        for bucket in range(GRAM_BUCKETS):
+            postings.extend(buckets.get(bucket, ()))
+            gram_offsets[bucket + 1] = len(postings)
+
+        return cls(words, [tuple(l) for l in lengths], gram_offsets, postings,
+                   normalization)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Map an index written by ``save`` into memory. Nothing is parsed up
+        front, and every process loading the same file shares its pages.
+        """
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version = struct.unpack_from("<8sI", data, 0)
+        if magic != COMPILED_MAGIC or version not in (1, COMPILED_VERSION):
+            raise ValueError("%s is not a compiled password dictionary" % path)
+        if version == 1:
+            header = COMPILED_HEADER_V1
+            fields = header.unpack_from(data, 0) + (NORMALIZE_LOWER,)
+        else:
+            header = COMPILED_HEADER
+            fields = header.unpack_from(data, 0)
+        (magic, version, byteorder, count, n_lengths, gram_size,
+         gram_buckets, blob_size, normalization) = fields
+        if byteorder != (sys.byteorder == "big"):
+            raise ValueError("%s was compiled on a machine with a different "
+                             "byte order" % path)
+        if (gram_size, gram_buckets) != (GRAM_SIZE, GRAM_BUCKETS):
+            raise ValueError("%s was compiled with an incompatible index "
+                             "layout" % path)
+
+        view = memoryview(data)
+        pos = [header.size]
+
+        def section(items):
+            start, pos[0] = pos[0], pos[0] + items * 4
+            return view[start:pos[0]].cast("I")
+
+        offsets = section(count + 1)
+        flat = section(n_lengths * 3)
+        gram_offsets = section(GRAM_BUCKETS + 1)
+        postings = section(gram_offsets[GRAM_BUCKETS])
+        blob = view[pos[0]:pos[0] + blob_size]
+
+        lengths = [tuple(flat[i:i + 3]) for i in range(0, len(flat), 3)]
+        return cls(CompiledWords(offsets, blob), lengths, gram_offsets,
+                   postings, normalization)
+
+    def save(self, path):
+        """
+        Write the index in the format read by ``load``. The file is written
+        next to ``path`` and renamed into place, so processes that already
+        mapped the old file keep a consistent view of it.
+        """
+        offsets = array("I", [0])
+        encoded = []
+        for word in self.words:
+            encoded.append(word.encode("utf-8"))
+            offsets.append(offsets[-1] + len(encoded[-1]))
+        flat = array("I", [x for length in self.lengths for x in length])
+
+        tmp = "%s.tmp%d" % (path, os.getpid())
+        with open(tmp, "wb") as f:
+            f.write(COMPILED_HEADER.pack(
+                COMPILED_MAGIC, COMPILED_VERSION, sys.byteorder == "big",
+                len(self.words), len(self.lengths), GRAM_SIZE, GRAM_BUCKETS,
+                offsets[-1], self.normalization))
+            for table in (offsets, flat, array("I", self.gram_offsets),
+                          array("I", self.postings)):
+                f.write(table.tobytes())
+            for word in encoded:
+                f.write(word)
+        os.rename(tmp, path)
+
+    def __len__(self):
+        return len(self.words)
+
+    @property
+    def cache_nbytes(self):
+        """
+        Bytes held in process memory by the match mask and code point
+        caches, which are private even for a memory-mapped index.
+        """
+        nbytes = self.masks_nbytes
+        if self.matrices is not None:
+            nbytes += self.matrices.nbytes
+        return nbytes
+
+    def find(self, word):
+        """
+        The id of the normalized ``word`` if it is indexed, or None.
+        """
+        for length, start, stop in self.lengths:
+            if length == len(word):
+                i = bisect_left(self.words, word, start, stop)
+                if i < stop and self.words[i] == word:
+                    return i
+                return None
+        return None
+
+    def contains(self, word):
+        """
+        Whether the normalized ``word`` is one of the indexed words.
+        """
+        return self.find(word) is not None
+
+    def masks(self, i):
+        masks = self._masks.pop(i, None)
+        if masks is None:
+            masks = haystack_masks(self.words[i])
+            self.masks_nbytes += masks_size(masks)
+            while len(self._masks) >= MASK_CACHE_SIZE:
+                self.masks_nbytes -= masks_size(self._masks.popitem(False)[1])
+        self._masks[i] = masks
+        return masks
+
+    def limits(self, m, threshold, ahead=False):
+        """
+        Yield ``(length, start, stop, k)`` for the length buckets whose
+        words a needle of length ``m`` can be ``threshold``-similar to
+        within ``k`` edits; with ``ahead``, for the needle or any longer
+        one beginning with it.
+        """
+        for length, start, stop in self.lengths:
+            if ahead:
+                longest, k = max_reach(length, threshold)
+                if m > longest:
+                    continue
+            else:
+                k = max_distance(m, length, threshold)
+                if k < 0 or m - length > k:
+                    continue
+            yield length, start, stop, k
+
+    def candidates(self, needle, threshold, ahead=False):
+        """
+        Return the ids of the words that could be ``threshold``-similar to
+        the normalized ``needle``, in ascending order. Every word that can
+        match is included; some that cannot may be too. With ``ahead``, the
+        words are those any longer needle beginning with ``needle`` could
+        match.
+        """
+        m = len(needle)
+        n_grams = max(m - GRAM_SIZE + 1, 0)
+
+        full, filtered = [], {}
+        for length, start, stop, k in self.limits(m, threshold, ahead):
+            if k >= m and ahead:
+                full.append((start, stop))
+            elif k >= m:
+                # Deleting the whole needle is within budget, so any word of
+                # this length matches; one representative is enough.
+                full.append((start, start + 1))
+            elif n_grams - k * GRAM_SIZE <= 0:
+                full.append((start, stop))
+            else:
+                filtered[start] = n_grams - k * GRAM_SIZE
+
+        ids = []
+        for start, stop in full:
+            ids.extend(range(start, stop))
+
+        if filtered:
+            counts = Counter()
+            grams = Counter(gram_bucket(needle[i:i + GRAM_SIZE])
+                            for i in range(n_grams))
+            for bucket, times in grams.items():
+                posting = self.postings[
+                    self.gram_offsets[bucket]:self.gram_offsets[bucket + 1]]
+                for _ in range(times):
+                    counts.update(posting)
+            for i, count in counts.items():
+                start = self._starts[bisect_right(self._starts, i) - 1]
+                need = filtered.get(start)
+                if need is not None and count >= need:
+                    ids.append(i)
+
+        ids.sort()
+        return ids
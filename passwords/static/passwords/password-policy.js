@@ -0,0 +1,154 @@
+/*
+ * Client-side pre-validation for PasswordField.
+ *
+ * Password inputs with a data-password-policy attribute load the policy
+ * written by the export_password_policy management command and flag
+ * passwords it rejects with setCustomValidity(), so the browser refuses to
+ * submit them. Inputs with a data-password-live attribute also post the
+ * passwords that pass to that URL as they are typed, for the checks only
+ * the server can run. The server still validates everything that is
+ * submitted.
+ */
+(function () {
+    "use strict";
+
+    var policies = {};
+
+    function unique(value, pattern) {
+        var seen = {};
+        (value.match(pattern) || []).forEach(function (c) { seen[c] = true; });
+        return Object.keys(seen).length;
+    }
+
+    var checks = {
+        length: function (rule, value) {
+            var length = Array.from(value).length;
+            if (rule.min_length !== null && length < rule.min_length) {
+                return rule.min_message;
+            }
+            if (rule.max_length !== null && length > rule.max_length) {
+                return rule.max_message;
+            }
+        },
+        complexity: function (rule, value) {
+            var want = rule.complexities, counts = {
+                UPPER: unique(value, /\p{Lu}/gu),
+                LOWER: unique(value, /\p{Ll}/gu),
+                LETTERS: unique(value, /[\p{Lu}\p{Ll}]/gu),
+                DIGITS: unique(value, /\p{Nd}/gu),
+                SPECIAL: unique(value, /[^\p{Lu}\p{Ll}\p{Nd}\s]/gu),
+                WORDS: unique(value, /[\p{L}\p{N}_]+/gu)
+            };
+            for (var key in want) {
+                if (counts[key] < want[key]) {
+                    return rule.message;
+                }
+            }
+        },
+        common_sequence: function (rule, value) {
+            var needle = value.toLowerCase();
+            for (var i = 0; i < rule.sequences.length; i++) {
+                var forward = rule.sequences[i].toLowerCase();
+                var backward = Array.from(forward).reverse().join("");
+                if (needle.length > 1 && forward.indexOf(needle) !== -1) {
+                    return rule.message;
+                }
+                if (!rule.min_run) {
+                    continue;
+                }
+                for (var j = 0; j + rule.min_run <= needle.length; j++) {
+                    var run = needle.substr(j, rule.min_run);
+                    if (forward.indexOf(run) !== -1 || backward.indexOf(run) !== -1) {
+                        return rule.message;
+                    }
+                }
+            }
+        }
+        // dictionary_word rules are left to the server: a Bloom filter hit
+        // may be a false positive, and blocking one would lock the user out
+        // of that password for good.
+    };
+
+    function validate(policy, value) {
+        if (!value) {
+            return "";
+        }
+        for (var i = 0; i < policy.rules.length; i++) {
+            var rule = policy.rules[i], check = checks[rule.type];
+            var message = check && check(rule, value);
+            if (message) {
+                return message;
+            }
+        }
+        return "";
+    }
+
+    function load(url) {
+        if (!policies[url]) {
+            policies[url] = fetch(url).then(function (response) {
+                return response.json();
+            });
+        }
+        return policies[url];
+    }
+
+    function csrfToken(input) {
+        var field = input.form &&
+            input.form.querySelector("input[name=csrfmiddlewaretoken]");
+        if (field) {
+            return field.value;
+        }
+        var match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+        return match ? decodeURIComponent(match[1]) : "";
+    }
+
+    function attach(input) {
+        var source = input.getAttribute("data-password-policy");
+        var live = input.getAttribute("data-password-live");
+        var sent = 0;
+        var policy = source ? load(source) : Promise.resolve({rules: []});
+
+        // Only the answer to the latest keystroke is applied.
+        function check(value, request) {
+            var body = new FormData();
+            body.append("password", value);
+            fetch(live, {
+                method: "POST",
+                body: body,
+                credentials: "same-origin",
+                headers: {"X-CSRFToken": csrfToken(input)}
+            }).then(function (response) {
+                return response.json();
+            }).then(function (result) {
+                if (request === sent) {
+                    input.setCustomValidity(result.errors[0] || "");
+                }
+            });
+        }
+
+        policy.then(function (policy) {
+            function update() {
+                var message = validate(policy, input.value);
+                input.setCustomValidity(message);
+                sent++;
+                if (live && input.value && !message) {
+                    check(input.value, sent);
+                }
+            }
+            input.addEventListener("input", update);
+            update();
+        });
+    }
+
+    function init() {
+        var inputs = document.querySelectorAll(
+            "input[data-password-policy], input[data-password-live]");
+        Array.prototype.forEach.call(inputs, attach);
+    }
+
+    if (document.readyState === "loading") {
+        document.addEventListener("DOMContentLoaded", init);
+    } else {
+        init();
+    }
+})();
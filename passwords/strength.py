@@ -0,0 +1,221 @@
+# coding=utf-8
+"""
+Guessability estimate in the style of zxcvbn: every dictionary word,
+common sequence, repeat and date found in a password is a candidate
+match, and dynamic programming picks the decomposition of the password
+into matches and brute-forced runs that an attacker would need the fewest
+guesses for.
+"""
+from __future__ import division, unicode_literals
+
+import datetime
+import math
+import re
+from collections import namedtuple
+
+from .similarity import normalize
+
+
+Match = namedtuple("Match", "pattern i j token guesses")
+
+# Shortest dictionary word or sequence run worth reporting as a match.
+MIN_MATCH_LENGTH = 3
+MIN_YEAR_SPACE = 20
+REFERENCE_YEAR = datetime.date.today().year
+
+# Guesses below each bound get scores 0 to 3, and 4 above the last.
+SCORE_THRESHOLDS = (1e3, 1e6, 1e8, 1e10)
+
+DATE = re.compile(r"(\d{1,2})([\s/._-]?)(\d{1,2})\2((?:19|20)?\d{2})")
+YEAR = re.compile(r"(?:19|20)\d{2}")
+
+
+def cardinality(value):
+    """
+    Size of the alphabet a brute-force attack on ``value`` has to try,
+    from the character classes ComplexityValidator counts.
+    """
+    size = 0
+    if any(c.islower() for c in value):
+        size += 26
+    if any(c.isupper() for c in value):
+        size += 26
+    if any(c.isdigit() for c in value):
+        size += 10
+    if any(not c.isalnum() for c in value):
+        size += 33
+    return max(size, 10)
+
+
+def dictionary_matches(value, index):
+    if index is None or not len(index):
+        return
+    # Characters are normalized one by one so slices of the normalized
+    # password still line up with the original.
+    chars = [normalize(c, index.normalization) for c in value]
+    longest = index.lengths[-1][0]
+    guesses = len(index)
+    for i in range(len(value)):
+        for j in range(i + MIN_MATCH_LENGTH, len(value) + 1):
+            word = "".join(chars[i:j])
+            if len(word) > longest:
+                break
+            if index.contains(word):
+                token = value[i:j]
+                # Capitalization multiplies the variants to try.
+                factor = 1 if token.lower() == token else 2
+                yield Match("dictionary", i, j, token, guesses * factor)
+
+
+def sequence_matches(value, sequences):
+    lowered = value.lower()
+    forward = [s.lower() for s in sequences]
+    backward = [s[::-1] for s in forward]
+    i = 0
+    while i < len(value):
+        j = i + 1
+        while j < len(value) and any(lowered[i:j + 1] in s
+                                     for s in forward + backward):
+            j += 1
+        if j - i >= MIN_MATCH_LENGTH:
+            token = value[i:j]
+            if token[0] in "aAzZ019":
+                base = 4
+            elif token[0].isdigit():
+                base = 10
+            else:
+                base = 26
+            if not any(lowered[i:j] in s for s in forward):
+                base *= 2
+            yield Match("sequence", i, j, token, base * (j - i))
+            i = j
+        else:
+            i += 1
+
+
+def repeat_matches(value):
+    for pattern in (re.compile(r"(.+)\1+"), re.compile(r"(.+?)\1+")):
+        for m in pattern.finditer(value):
+            chunk = m.group(1)
+            count = len(m.group(0)) // len(chunk)
+            guesses = cardinality(chunk) ** len(chunk) * count
+            yield Match("repeat", m.start(), m.end(), m.group(0), guesses)
+
+
+def year_space(year):
+    return max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE)
+
+
+def date_matches(value):
+    for m in YEAR.finditer(value):
+        yield Match("date", m.start(), m.end(), m.group(0),
+                    year_space(int(m.group(0))))
+    for i in range(len(value)):
+        m = DATE.match(value, i)
+        if m is None:
+            continue
+        first, separator, second, year = m.groups()
+        first, second = int(first), int(second)
+        if not ((1 <= first <= 31 and 1 <= second <= 12) or
+                (1 <= first <= 12 and 1 <= second <= 31)):
+            continue
+        year = int(year)
+        if year < 100:
+            year += 1900 if year > 50 else 2000
+        guesses = 365 * year_space(year) * (4 if separator else 1)
+        yield Match("date", m.start(), m.end(), m.group(0), guesses)
+
+
+def most_guessable_sequence(value, matches):
+    """
+    Return ``(log10 guesses, matches)`` for the cheapest way to cover
+    ``value`` with ``matches`` and brute-forced runs between them. As in
+    zxcvbn, a decomposition into ``k`` parts costs ``k!`` times the product
+    of their guesses, since the attacker doesn't know the order of the
+    patterns either.
+    """
+    n = len(value)
+    card = cardinality(value)
+    log_card = math.log10(card)
+    by_end = [[] for _ in range(n + 1)]
+    for match in matches:
+        by_end[match.j].append(match)
+
+    # For each prefix length and part count, the lowest log10 product of
+    # guesses and how it got there, split by whether the last part is a
+    # brute-forced run that the next character can extend.
+    matched = [{} for _ in range(n + 1)]
+    brute = [{} for _ in range(n + 1)]
+    matched[0][0] = (0.0, None, None)
+
+    def offer(table, k, score, back, match):
+        if k not in table or score < table[k][0]:
+            table[k] = (score, back, match)
+
+    for j in range(1, n + 1):
+        for k, (score, _, _) in brute[j - 1].items():
+            offer(brute[j], k, score + log_card, (brute, j - 1, k), None)
+        for k, (score, _, _) in matched[j - 1].items():
+            offer(brute[j], k + 1, score + log_card, (matched, j - 1, k),
+                  None)
+        for match in by_end[j]:
+            cost = math.log10(max(match.guesses, 1))
+            for table in (matched, brute):
+                for k, (score, _, _) in table[match.i].items():
+                    offer(matched[j], k + 1, score + cost,
+                          (table, match.i, k), match)
+
+    best = None
+    for table in (matched, brute):
+        for k, (score, _, _) in table[n].items():
+            total = score + math.log10(math.factorial(k)) if k else 0.0
+            if best is None or total < best[0]:
+                best = (total, table, k)
+    if best is None:
+        return 0.0, []
+
+    total, table, k = best
+    parts, run_end, state = [], None, (table, n, k)
+    while state[1] > 0:
+        table, j, k = state
+        _, back, match = table[j][k]
+        if match is not None:
+            parts.append(match)
+        else:
+            if run_end is None:
+                run_end = j
+            if back[0] is not brute:
+                # The brute-forced run began at this step.
+                start = back[1]
+                parts.append(Match("bruteforce", start, run_end,
+                                   value[start:run_end],
+                                   card ** (run_end - start)))
+                run_end = None
+        state = back
+    parts.reverse()
+    return total, parts
+
+
+def estimate(value, index=None, sequences=()):
+    """
+    Estimate how many guesses ``value`` would take to crack, matching it
+    against the words of the ``SimilarityIndex`` ``index`` and against
+    ``sequences``. Returns ``guesses_log10``, a ``score`` from 0 (trivial)
+    to 4 (very hard) and the ``sequence`` of matches it was split into.
+    """
+    if not value:
+        return {"guesses_log10": 0.0, "score": 0, "sequence": []}
+    matches = []
+    matches.extend(dictionary_matches(value, index))
+    matches.extend(sequence_matches(value, sequences))
+    matches.extend(repeat_matches(value))
+    matches.extend(date_matches(value))
+    guesses_log10, parts = most_guessable_sequence(value, matches)
+
+    score = len(SCORE_THRESHOLDS)
+    for i, bound in enumerate(SCORE_THRESHOLDS):
+        if guesses_log10 < math.log10(bound):
+            score = i
+            break
+    return {"guesses_log10": guesses_log10, "score": score,
+            "sequence": parts}
@@ -0,0 +1,12 @@
+try:
+    from django.urls import re_path
+except ImportError:  # Django < 2.0
+    from django.conf.urls import url as re_path
+
+from . import views
+
+app_name = "passwords"
+
+urlpatterns = [
+    re_path(r"^validate/$", views.validate_password, name="validate"),
+]
@@ -1,13 +1,33 @@
 # coding=utf-8
 from __future__ import division, unicode_literals
 
+import copy
+import logging
+import multiprocessing
 import re
+import sys
+import threading
+from bisect import bisect_left
+from timeit import default_timer
 
 from django.conf import settings
-from django.core.exceptions import ValidationError
+from django.core.exceptions import (FieldDoesNotExist, ImproperlyConfigured,
+                                    ValidationError)
+from django.utils import translation
 from django.utils.translation import gettext_lazy as _
-from django.utils.encoding import smart_str
 
+from .bloom import BloomFilter
+from .breach import get_corpus
+from .cache import UNCACHED, verdicts
+from .dictionaries import registry
+from . import strength, vectorized
+from .signals import budget_exhausted, validation_finished
+from .similarity import (GRAM_SIZE, LEETSPEAK, NORMALIZE_LEETSPEAK,
+                         NORMALIZE_UNICODE, IncrementalScan,
+                         SequenceAutomaton, SimilarityIndex, max_distance,
+                         normalize, substring_distance)
+
+logger = logging.getLogger(__name__)
 
 COMMON_SEQUENCES = [
     "0123456789",
@@ -23,9 +43,6 @@ COMMON_SEQUENCES = [
     "qwertzuiopü*asdfghjklöä'>yxcvbnm;:_",
     "qaywsxedcrfvtgbzhnujmikolp",
 ]
-DICT_CACHE = []
-DICT_FILESIZE = -1
-DICT_MAX_CACHE = 1000000
 
 # Settings
 PASSWORD_MIN_LENGTH = getattr(
@@ -36,21 +53,187 @@ PASSWORD_DICTIONARY = getattr(
     settings, "PASSWORD_DICTIONARY", None)
 PASSWORD_MATCH_THRESHOLD = getattr(
     settings, "PASSWORD_MATCH_THRESHOLD", 0.9)
+PASSWORD_SIMILARITY_BACKEND = getattr(
+    settings, "PASSWORD_SIMILARITY_BACKEND", "auto")
+PASSWORD_DICTIONARY_LOAD = getattr(
+    settings, "PASSWORD_DICTIONARY_LOAD", "lazy")
+PASSWORD_SIMILARITY_TIME_BUDGET = getattr(
+    settings, "PASSWORD_SIMILARITY_TIME_BUDGET", None)
+PASSWORD_SIMILARITY_WORK_BUDGET = getattr(
+    settings, "PASSWORD_SIMILARITY_WORK_BUDGET", None)
+PASSWORD_SIMILARITY_BUDGET_POLICY = getattr(
+    settings, "PASSWORD_SIMILARITY_BUDGET_POLICY", "accept")
 PASSWORD_COMMON_SEQUENCES = getattr(
     settings, "PASSWORD_COMMON_SEQUENCES", COMMON_SEQUENCES)
+PASSWORD_COMMON_SEQUENCE_MIN_RUN = getattr(
+    settings, "PASSWORD_COMMON_SEQUENCE_MIN_RUN", None)
 PASSWORD_COMPLEXITY = getattr(
     settings, "PASSWORD_COMPLEXITY", None)
+PASSWORD_MIN_STRENGTH = getattr(
+    settings, "PASSWORD_MIN_STRENGTH", 3)
+PASSWORD_BREACH_CORPUS = getattr(
+    settings, "PASSWORD_BREACH_CORPUS", None)
+PASSWORD_DICTIONARY_BLOOM = getattr(
+    settings, "PASSWORD_DICTIONARY_BLOOM", False)
+PASSWORD_DICTIONARY_BLOOM_ERROR_RATE = getattr(
+    settings, "PASSWORD_DICTIONARY_BLOOM_ERROR_RATE", 0.01)
+PASSWORD_DICTIONARY_BLOOM_VARIANTS = getattr(
+    settings, "PASSWORD_DICTIONARY_BLOOM_VARIANTS", False)
+PASSWORD_DICTIONARY_LEETSPEAK = getattr(
+    settings, "PASSWORD_DICTIONARY_LEETSPEAK", False)
+PASSWORD_USER_ATTRIBUTES = getattr(
+    settings, "PASSWORD_USER_ATTRIBUTES",
+    ("username", "email", "first_name", "last_name"))
+
+AFFIXES = re.compile(r"^[\W\d_]+|[\W\d_]+$", re.UNICODE)
+TOKEN_SEPARATORS = re.compile(r"[\W_]+", re.UNICODE)
+
+
+# Guards the one-time building of indexes, Bloom filters and automatons.
+_load_lock = threading.RLock()
+
+
+class ValidationCancelled(Exception):
+    """
+    Raised inside a similarity scan abandoned through its cancel event.
+    """
+
+
+class BudgetExhausted(Exception):
+    """
+    Raised inside a similarity scan that ran out of its time or work
+    budget.
+    """
+
+    def __init__(self, scanned, elapsed):
+        super(BudgetExhausted, self).__init__(scanned, elapsed)
+        self.scanned = scanned
+        self.elapsed = elapsed
+
+
+class BaseValidator(object):
+    """
+    Plumbing shared by the validators: the verdict cache, the
+    ``validation_finished`` signal, ``explain()`` and ``avalidate()``.
+    Subclasses implement ``_validate(value, stats=None, cancel=None)``,
+    raising ``ValidationError``; ``stats``, when given, is a dict to record
+    ``load_elapsed``, ``scanned``, ``pruned`` and ``degraded`` in. A pass
+    that must not be cached returns ``cache.UNCACHED``.
+    """
+    # Whether verdicts are worth keeping in the verdict cache.
+    cacheable = False
+    # Rough relative cost, so a PasswordPolicy can run cheap checks first.
+    cost = 1
+
+    def cache_key(self):
+        # Cached errors hold messages rendered in the active language.
+        return "%s.%s|%s" % (type(self).__module__, type(self).__name__,
+                             translation.get_language())
+
+    def __call__(self, value):
+        self._check(value)
 
+    def preload(self):
+        """
+        Load whatever data the check needs now instead of on first use.
+        """
 
-class LengthValidator(object):
+    def avalidate(self, value):
+        from . import aio
+        return aio.run_inline(self, value)
+
+    def explain(self, value):
+        """
+        Validate ``value`` without raising and return how it went: whether
+        it is ``valid``, the error ``code`` and ``messages``, the time spent
+        (``elapsed``, of which ``load_elapsed`` loading data) and how many
+        haystacks were ``scanned`` and ``pruned``. The verdict cache is
+        bypassed so the numbers reflect the actual work.
+        """
+        report, error = self._measure(value)
+        report.update({
+            "validator": self,
+            "valid": error is None,
+            "messages": error.messages if error is not None else [],
+        })
+        return report
+
+    def _check(self, value, cancel=None):
+        if not self.cacheable:
+            return self._run(value, cancel)
+        if not validation_finished.has_listeners(type(self)):
+            return verdicts.check(self.cache_key(), value,
+                                  lambda value: self._run(value, cancel))
+
+        ran = []
+
+        def run(value):
+            ran.append(True)
+            self._run(value, cancel)
+
+        code = None
+        start = default_timer()
+        try:
+            verdicts.check(self.cache_key(), value, run)
+        except ValidationError as e:
+            code = e.code
+            raise
+        finally:
+            if not ran:
+                # Answered from the verdict cache: report it as such, with
+                # nothing loaded or scanned.
+                self._send(validation_finished,
+                           elapsed=default_timer() - start, load_elapsed=0.0,
+                           scanned=0, pruned=0, code=code, cached=True,
+                           degraded=False)
+
+    def _run(self, value, cancel=None):
+        if not validation_finished.has_listeners(type(self)):
+            return self._validate(value, cancel=cancel)
+
+        report, error = self._measure(value, cancel)
+        self._send(validation_finished, cached=False, **report)
+        if error is not None:
+            raise error
+        if report["degraded"]:
+            return UNCACHED
+
+    def _send(self, signal, **report):
+        # A broken monitoring receiver must not fail password validation.
+        for receiver, result in signal.send_robust(
+                sender=type(self), validator=self, **report):
+            if isinstance(result, Exception):
+                logger.error("Error in password validation signal receiver "
+                             "%r", receiver, exc_info=(type(result), result,
+                                                       result.__traceback__))
+
+    def _measure(self, value, cancel=None):
+        stats = {"load_elapsed": 0.0, "scanned": 0, "pruned": 0,
+                 "degraded": False}
+        error = None
+        start = default_timer()
+        try:
+            self._validate(value, stats=stats, cancel=cancel)
+        except ValidationError as e:
+            error = e
+        stats["elapsed"] = default_timer() - start
+        stats["code"] = error.code if error is not None else None
+        return stats, error
+
+    def _validate(self, value, stats=None, cancel=None):
+        raise NotImplementedError
+
+
+class LengthValidator(BaseValidator):
     message = _("Invalid Length (%s)")
     code = "length"
+    cost = 0
 
     def __init__(self, min_length=None, max_length=None):
         self.min_length = min_length
         self.max_length = max_length
 
-    def __call__(self, value):
+    def _validate(self, value, stats=None, cancel=None):
         err = None
         if self.min_length is not None and len(value) < self.min_length:
             err = _("Must be %s characters or more") % self.min_length
@@ -61,14 +244,20 @@ class LengthValidator(object):
             raise ValidationError(self.message % err, code=self.code)
 
 
-class ComplexityValidator(object):
+class ComplexityValidator(BaseValidator):
     message = _("Must be more complex (%s)")
     code = "complexity"
+    cacheable = True
 
     def __init__(self, complexities):
         self.complexities = complexities
 
-    def __call__(self, value):
+    def cache_key(self):
+        return "%s|%r" % (
+            super(ComplexityValidator, self).cache_key(),
+            sorted(self.complexities.items()) if self.complexities else None)
+
+    def _validate(self, value, stats=None, cancel=None):
         if self.complexities is None:
             return
 
@@ -120,9 +309,20 @@ class ComplexityValidator(object):
                                   code=self.code)
 
 
-class BaseSimilarityValidator(object):
+class BaseSimilarityValidator(BaseValidator):
     message = _("Too Similar to [%(haystacks)s]")
     code = "similarity"
+    cacheable = True
+    cost = 3
+    # How haystacks and passwords are normalized before comparing them.
+    normalization = NORMALIZE_UNICODE
+    # "python", "numpy", or "auto" for NumPy whenever it is installed.
+    backend = PASSWORD_SIMILARITY_BACKEND
+    # Seconds and candidates a scan may spend, and what to conclude when
+    # either runs out; see degrade().
+    time_budget = PASSWORD_SIMILARITY_TIME_BUDGET
+    work_budget = PASSWORD_SIMILARITY_WORK_BUDGET
+    budget_policy = PASSWORD_SIMILARITY_BUDGET_POLICY
 
     def __init__(self, haystacks=None, threshold=None):
         self.haystacks = haystacks if haystacks else []
@@ -130,76 +330,703 @@ class BaseSimilarityValidator(object):
             self.threshold = PASSWORD_MATCH_THRESHOLD
         else:
             self.threshold = threshold
+        self._index = None
 
-    def fuzzy_substring(self, needle, haystack):
-        needle, haystack = needle.lower(), haystack.lower()
-        m, n = len(needle), len(haystack)
-
-        if m == 1:
-            if needle not in haystack:
-                return -1
-        if n == 0:
-            return m
-
-        row1 = [0] * (n + 1)
-        for i in range(0, m):
-            row2 = [i + 1]
-            for j in range(0, n):
-                cost = 1 if needle[i] != haystack[j] else 0
-                row2.append(min(
-                    row1[j + 1] + 1,
-                    row2[j] + 1,
-                    row1[j] + cost))
-            row1 = row2
-        return min(row1)
+    def get_index(self):
+        # Built once, on first use, from the haystacks, which are treated
+        # as immutable from then on.
+        if self._index is None:
+            with _load_lock:
+                if self._index is None:
+                    self._index = SimilarityIndex.from_haystacks(
+                        self.haystacks, self.normalization)
+        return self._index
 
-    def __call__(self, value):
-        for haystack in self.haystacks:
-            distance = self.fuzzy_substring(value, haystack)
-            longest = max(len(value), len(haystack))
-            similarity = (longest - distance) / longest
-            if similarity >= self.threshold:
-                raise ValidationError(
-                    self.message % {"haystacks": ", ".join(self.haystacks)},
-                    code=self.code)
+    def preload(self):
+        self.get_index()
+        if self.backend != "python":
+            # Import NumPy now too, before workers are forked.
+            self.vectorized()
+
+    def is_similar(self, value, haystack):
+        distance = self.fuzzy_substring(value, haystack)
+        longest = max(len(value), len(haystack))
+        similarity = (longest - distance) / longest
+        return similarity >= self.threshold
+
+    def similarity(self, value, haystack):
+        """
+        How similar ``value`` is to a matched ``haystack``, as reported in
+        the rejection.
+        """
+        normalization = self.get_index().normalization
+        needle = normalize(value, normalization)
+        haystack = normalize(haystack, normalization)
+        distance = max(substring_distance(needle, haystack), 0)
+        longest = max(len(needle), len(haystack))
+        return (longest - distance) / longest
+
+    def find_match(self, value, cancel=None, stats=None, scan=None):
+        """
+        Return a haystack that ``value`` is too similar to, or None.
+        Setting the ``cancel`` event abandons the scan with
+        ``ValidationCancelled``; ``stats`` counts the haystacks scored and
+        pruned. With a ``time_budget`` or ``work_budget`` set, the likeliest
+        matches are scored first and ``BudgetExhausted`` is raised when the
+        budget runs out. An ``IncrementalScan`` of the index passed as
+        ``scan``, seeded for an earlier prefix of ``value``, is advanced
+        instead of scoring the candidates afresh.
+        """
+        if len(value) < 2:
+            # Needles this short match any haystack, or blow up on an empty
+            # one; keep the plain scan so the outcome is unchanged.
+            for haystack in self.haystacks:
+                if stats is not None:
+                    stats["scanned"] += 1
+                if self.is_similar(value, haystack):
+                    return haystack
+            return None
+        check = self.budget_check()
+        index = self.get_index()
+        needle = normalize(value, index.normalization)
+        if scan is not None:
+            return scan.find(needle, check)
+
+        ids = index.candidates(needle, self.threshold)
+        if stats is not None:
+            stats["pruned"] += len(index) - len(ids)
+        vectorize = self.vectorized() and len(needle) >= 2
+
+        # Candidates come in ascending order, so the words of each length
+        # bucket are a contiguous run of them.
+        groups, pos = [], 0
+        for length, start, stop in index.lengths:
+            end = bisect_left(ids, stop, pos)
+            if end > pos:
+                groups.append((length, start, ids[pos:end]))
+            pos = end
+        if check is not None:
+            groups = self.budget_order(needle, index, ids, groups)
+
+        work = 0
+        for length, start, group in groups:
+            limit = max_distance(len(needle), length, self.threshold)
+            if vectorize and len(group) >= vectorized.VECTORIZE_MIN_ROWS:
+                if cancel is not None and cancel.is_set():
+                    raise ValidationCancelled()
+                if check is not None:
+                    check(work)
+                work += len(group)
+                if stats is not None:
+                    stats["scanned"] += len(group)
+                i = vectorized.first_within(needle, index, start, group,
+                                            limit)
+                if i is not None:
+                    return index.words[i]
+                continue
+            for i in group:
+                if cancel is not None and cancel.is_set():
+                    raise ValidationCancelled()
+                if check is not None:
+                    check(work)
+                work += 1
+                if stats is not None:
+                    stats["scanned"] += 1
+                haystack = index.words[i]
+                distance = substring_distance(needle, haystack,
+                                              index.masks(i), limit)
+                if distance <= limit:
+                    return haystack
+        return None
+
+    def budget_order(self, needle, index, ids, groups):
+        """
+        Reorder candidate ``groups`` so a budgeted scan tries the likeliest
+        matches first: the needle itself and the words it starts with, then
+        buckets by how close their length is to the needle's. Word lists
+        carry no frequencies once indexed, so closeness stands in for them.
+        """
+        candidates = set(ids)
+        wanted = []
+        for k in range(len(needle), GRAM_SIZE - 1, -1):
+            i = index.find(needle[:k])
+            if i is not None and i in candidates:
+                wanted.append(i)
+        buckets, rest = {}, []
+        for length, start, group in groups:
+            hits = candidates.intersection(wanted).intersection(group)
+            for i in hits:
+                buckets[i] = (length, start)
+            if hits:
+                group = [i for i in group if i not in hits]
+            if group:
+                rest.append((length, start, group))
+        rest.sort(key=lambda g: abs(g[0] - len(needle)))
+        return [buckets[i] + ([i],) for i in wanted] + rest
+
+    def budget_check(self):
+        """
+        A callable raising ``BudgetExhausted`` once the ``work`` passed to
+        it or the time since this call is over budget, or None without
+        budgets.
+        """
+        if self.time_budget is None and self.work_budget is None:
+            return None
+        start_time = default_timer()
+        return lambda work: self.check_budget(work, start_time)
+
+    def check_budget(self, work, start_time):
+        elapsed = default_timer() - start_time
+        if ((self.work_budget is not None and work >= self.work_budget) or
+                (self.time_budget is not None and
+                 elapsed >= self.time_budget)):
+            raise BudgetExhausted(work, elapsed)
+
+    def degrade(self, value, exhausted, stats=None):
+        """
+        Settle the verdict of a scan that ran out of budget according to
+        ``budget_policy``: "accept" passes the password, "reject" fails it
+        and "exact" fails it only if it is one of the haystacks. Neither
+        outcome is cached, since a later scan may get further.
+        """
+        self._send(budget_exhausted, elapsed=exhausted.elapsed,
+                   scanned=exhausted.scanned, policy=self.budget_policy)
+        if stats is not None:
+            stats["degraded"] = True
+        haystack = None
+        if self.budget_policy == "reject":
+            haystack = ""
+        elif self.budget_policy == "exact":
+            index = self.get_index()
+            needle = normalize(value, index.normalization)
+            if index.contains(needle):
+                haystack = needle
+        if haystack is not None:
+            error = ValidationError(self.message, code=self.code, params={
+                "haystacks": haystack,
+                "similarity": 1.0 if haystack else None,
+            })
+            error.cacheable = False
+            raise error
+        return UNCACHED
+
+    def vectorized(self):
+        """
+        Whether to score large candidate buckets with the NumPy backend.
+        """
+        if self.backend == "numpy" or (self.backend == "auto" and
+                                       vectorized.available()):
+            if not vectorized.available():
+                raise ImproperlyConfigured(
+                    "PASSWORD_SIMILARITY_BACKEND is 'numpy' but NumPy is not "
+                    "installed.")
+            return True
+        return False
+
+    def fuzzy_substring(self, needle, haystack, limit=None):
+        return substring_distance(normalize(needle, self.normalization),
+                                  normalize(haystack, self.normalization),
+                                  limit=limit)
+
+    def cache_key(self):
+        return "%s|%r|%d" % (super(BaseSimilarityValidator, self).cache_key(),
+                             self.threshold, self.get_index().token)
+
+    def avalidate(self, value):
+        """
+        Coroutine validating ``value`` on the bounded executor from
+        ``passwords.aio``; cancelling it abandons the scan.
+        """
+        from . import aio
+        return aio.run_in_executor(self._check, value)
+
+    def _validate(self, value, stats=None, cancel=None):
+        if stats is not None:
+            start = default_timer()
+            self.get_index()
+            stats["load_elapsed"] += default_timer() - start
+        try:
+            haystack = self.find_match(value, cancel, stats)
+        except BudgetExhausted as e:
+            return self.degrade(value, e, stats)
+        if haystack is not None:
+            raise self.match_error(value, haystack)
+
+    def validate_incremental(self, value, scans):
+        """
+        Validate ``value``, a password being typed, keeping an
+        ``IncrementalScan`` of the index in the dict ``scans`` between
+        calls. While each call types on from the last, once the scan is
+        seeded, each character costs one row per remaining candidate;
+        otherwise the normal scan runs and the scan is seeded afresh. The
+        budgets apply to both; the verdict cache is bypassed.
+        """
+        index = self.get_index()
+        scan = scans.get(self)
+        if (scan is None or scan.index is not index or
+                scan.threshold != self.threshold):
+            scan = scans[self] = IncrementalScan(index, self.threshold)
+        needle = normalize(value, index.normalization)
+        try:
+            if len(needle) >= 2 and scan.extends(needle):
+                haystack = self.find_match(value, scan=scan)
+            else:
+                haystack = self.find_match(value)
+                scan.seed(needle, self.budget_check())
+        except BudgetExhausted as e:
+            return self.degrade(value, e)
+        if haystack is not None:
+            raise self.match_error(value, haystack)
+
+    def match_error(self, value, haystack):
+        # Only the match goes into the error, as params Django interpolates
+        # when the message is rendered; joining every haystack would cost as
+        # much as the scan for a dictionary.
+        return ValidationError(self.message, code=self.code, params={
+            "haystacks": haystack,
+            "similarity": self.similarity(value, haystack),
+        })
 
 
 class DictionaryValidator(BaseSimilarityValidator):
     message = _("Based on a dictionary word")
     code = "dictionary_word"
+    cost = 4
 
-    def __init__(self, words=None, dictionary=None, threshold=None):
+    def __init__(self, words=None, dictionary=None, threshold=None,
+                 bloom=None, bloom_error_rate=None, bloom_variants=None,
+                 leetspeak=None):
         haystacks = []
-        if dictionary:
-            words = self.get_dictionary_words(dictionary)
-        if words:
+        self.dictionary = dictionary
+        if leetspeak is None:
+            leetspeak = PASSWORD_DICTIONARY_LEETSPEAK
+        # A compiled dictionary keeps the normalization it was built with.
+        if leetspeak:
+            self.normalization = NORMALIZE_LEETSPEAK
+        self.bloom = PASSWORD_DICTIONARY_BLOOM if bloom is None else bloom
+        if bloom_error_rate is None:
+            bloom_error_rate = PASSWORD_DICTIONARY_BLOOM_ERROR_RATE
+        self.bloom_error_rate = bloom_error_rate
+        if bloom_variants is None:
+            bloom_variants = PASSWORD_DICTIONARY_BLOOM_VARIANTS
+        self.bloom_variants = bloom_variants
+        self._bloom = None
+        # A dictionary is loaded on first use through the shared registry,
+        # which also picks up changes to the file; the index doubles as the
+        # haystacks.
+        if not dictionary and words:
             haystacks.extend(words)
         super(DictionaryValidator, self).__init__(
             haystacks=haystacks,
             threshold=threshold)
 
+    @property
+    def haystacks(self):
+        if self.dictionary:
+            return self.get_index().words
+        return self._haystacks
+
+    @haystacks.setter
+    def haystacks(self, value):
+        self._haystacks = value
+
+    def get_index(self):
+        if self.dictionary:
+            return registry.get(self.dictionary, self.normalization)
+        return super(DictionaryValidator, self).get_index()
+
     def get_dictionary_words(self, dictionary):
-        if DICT_CACHE:
-            return DICT_CACHE
-        if DICT_FILESIZE is -1:
-            f = open(dictionary)
-            f.seek(0,2)
-            DICT_FILESIZE = f.tell()
-            f.close()
-            if DICT_FILESIZE < 1000000:
-                with open(dictionary) as dictionary:
-                    DICT_CACHE = [smart_str(x.strip()) for x in dictionary.readlines()]
-                    return DICT_CACHE
-        with open(dictionary) as dictionary:
-            return [smart_str(x.strip()) for x in dictionary.readlines()]
+        return registry.get(dictionary, self.normalization).words
+
+    def __getstate__(self):
+        # A Bloom filter loaded from disk is memory-mapped and can't be
+        # pickled for spawned workers; they load their own.
+        state = self.__dict__.copy()
+        state["_bloom"] = None
+        return state
+
+    def get_bloom(self):
+        """
+        The Bloom filter for the exact-match fast path: loaded from disk when
+        ``bloom`` is a path, otherwise built from the words on first use and
+        rebuilt if the dictionary is reloaded.
+        """
+        index = self.get_index()
+        if self._bloom is None or self._bloom[0] != index.token:
+            with _load_lock:
+                if self._bloom is None or self._bloom[0] != index.token:
+                    if self.bloom is True:
+                        bloom = BloomFilter.from_words(index.words,
+                                                       self.bloom_error_rate)
+                    else:
+                        bloom = BloomFilter.load(self.bloom)
+                    self._bloom = (index.token, bloom)
+        return self._bloom[1]
+
+    def preload(self):
+        super(DictionaryValidator, self).preload()
+        if self.bloom:
+            self.get_bloom()
+
+    def exact_variants(self, value):
+        """
+        The normalized password and, with ``bloom_variants``, the common
+        disguises of a banned word: surrounding digits and symbols stripped,
+        leetspeak undone and reversed.
+        """
+        value = normalize(value, self.get_index().normalization)
+        yield value
+        if self.bloom_variants:
+            stripped = AFFIXES.sub("", value)
+            unleeted = "".join(LEETSPEAK.get(c, c) for c in value)
+            seen = set([value])
+            for variant in (stripped, unleeted, value[::-1]):
+                if variant and variant not in seen:
+                    seen.add(variant)
+                    yield variant
+
+    def cache_key(self):
+        return "%s|%r" % (super(DictionaryValidator, self).cache_key(),
+                          bool(self.bloom and self.bloom_variants))
+
+    def find_match(self, value, cancel=None, stats=None, scan=None):
+        if self.bloom:
+            bloom = self.get_bloom()
+            index = self.get_index()
+            for variant in self.exact_variants(value):
+                # Hits are confirmed against the index, so a false positive
+                # only costs a binary search.
+                if variant in bloom and index.contains(variant):
+                    if stats is not None:
+                        stats["pruned"] += len(index)
+                    return variant
+        return super(DictionaryValidator, self).find_match(value, cancel,
+                                                           stats, scan)
 
 
 class CommonSequenceValidator(BaseSimilarityValidator):
     message = _("Based on a common sequence of characters")
     code = "common_sequence"
 
+    def __init__(self, haystacks=None, threshold=None, min_run=None):
+        super(CommonSequenceValidator, self).__init__(
+            haystacks=haystacks, threshold=threshold)
+        if min_run is None:
+            min_run = PASSWORD_COMMON_SEQUENCE_MIN_RUN
+        self.min_run = min_run
+        self._automaton = None
+
+    def get_automaton(self):
+        if self._automaton is None:
+            with _load_lock:
+                if self._automaton is None:
+                    self._automaton = SequenceAutomaton(self.haystacks,
+                                                        self.min_run)
+        return self._automaton
+
+    def preload(self):
+        super(CommonSequenceValidator, self).preload()
+        if self.min_run:
+            self.get_automaton()
+
+    def cache_key(self):
+        return "%s|%r" % (super(CommonSequenceValidator, self).cache_key(),
+                          self.min_run)
+
+    def find_match(self, value, cancel=None, stats=None, scan=None):
+        # With min_run set, any run of that many characters from a
+        # sequence, forwards or backwards, anywhere in the password is
+        # rejected before the fuzzy comparison of the whole password.
+        if self.min_run:
+            run = self.get_automaton().find(normalize(value))
+            if run is not None:
+                return run
+        return super(CommonSequenceValidator, self).find_match(
+            value, cancel, stats, scan)
+
+
+def user_tokens(user, attributes=None, normalization=NORMALIZE_UNICODE):
+    """
+    The normalized values of ``attributes`` of ``user``, and the parts they
+    split into at punctuation, as ``(attribute, token)`` pairs; an email
+    address contributes its local part. They are remembered on the user
+    object, which lives as long as the request, so every check of the
+    request asking for the same attributes shares them, and recomputed if
+    an attribute changes.
+    """
+    if user is None:
+        return ()
+    if attributes is None:
+        attributes = PASSWORD_USER_ATTRIBUTES
+    values = tuple("%s" % (getattr(user, attribute, None) or "")
+                   for attribute in attributes)
+    key = (tuple(attributes), values, normalization)
+    memo = user.__dict__.setdefault("_password_user_tokens", {})
+    if key not in memo:
+        tokens = []
+        for attribute, value in zip(attributes, values):
+            if attribute == "email":
+                value = value.rpartition("@")[0] or value
+            value = normalize(value, normalization)
+            seen = set()
+            for token in [value] + TOKEN_SEPARATORS.split(value):
+                if len(token) > 1 and token not in seen:
+                    seen.add(token)
+                    tokens.append((attribute, token))
+        memo[key] = tuple(tokens)
+    return memo[key]
+
+
+class UserAttributeSimilarityValidator(BaseSimilarityValidator):
+    """
+    Rejects passwords too similar to the username, email local part or
+    names of a user, with the comparison and threshold of the other
+    similarity validators. ``for_user()`` returns a copy bound to the user
+    to check against; verdicts depend on the user and are never cached.
+    """
+    message = _("Too similar to your %(attribute)s")
+    code = "user_attribute"
+    cacheable = False
+    cost = 2
+    user = None
+
+    def __init__(self, attributes=None, threshold=None):
+        super(UserAttributeSimilarityValidator, self).__init__(
+            threshold=threshold)
+        if attributes is None:
+            attributes = PASSWORD_USER_ATTRIBUTES
+        self.attributes = tuple(attributes)
+
+    def for_user(self, user):
+        validator = copy.copy(self)
+        validator.user = user
+        return validator
+
+    def attribute_name(self, attribute):
+        try:
+            return self.user._meta.get_field(attribute).verbose_name
+        except (AttributeError, FieldDoesNotExist):
+            return attribute.replace("_", " ")
+
+    def validate_incremental(self, value, scans):
+        # A handful of tokens per user: nothing to gain from keeping rows.
+        self._validate(value)
+
+    def find_match(self, value, cancel=None, stats=None, scan=None):
+        needle = normalize(value, self.normalization)
+        if len(needle) < 2:
+            return None
+        for attribute, token in user_tokens(self.user, self.attributes,
+                                            self.normalization):
+            if stats is not None:
+                stats["scanned"] += 1
+            limit = max_distance(len(needle), len(token), self.threshold)
+            if limit >= 0 and substring_distance(needle, token,
+                                                 limit=limit) <= limit:
+                return attribute, token
+        return None
+
+    def _validate(self, value, stats=None, cancel=None):
+        match = self.find_match(value, cancel, stats)
+        if match is not None:
+            attribute, token = match
+            raise ValidationError(self.message, code=self.code, params={
+                "attribute": self.attribute_name(attribute),
+                "haystacks": token,
+                "similarity": self.similarity(value, token),
+            })
+
+
+class BreachedPasswordValidator(BaseValidator):
+    message = _("Found in a list of breached passwords")
+    code = "breached"
+    cost = 2
+
+    def __init__(self, corpus=None):
+        self.corpus = corpus
+
+    def preload(self):
+        if self.corpus is not None:
+            get_corpus(self.corpus)
+
+    def _validate(self, value, stats=None, cancel=None):
+        if self.corpus is None:
+            return
+        if value in get_corpus(self.corpus):
+            raise ValidationError(self.message, code=self.code)
+
+
+class StrengthValidator(BaseValidator):
+    """
+    Rejects passwords estimated to take too few guesses to crack, scoring
+    them from 0 to 4 with ``strength.estimate`` against the words of a
+    DictionaryValidator and the common sequences.
+    """
+    message = _("Too easy to guess")
+    code = "weak"
+    cacheable = True
+    cost = 4
+
+    def __init__(self, min_score=None, words=None, dictionary=None,
+                 sequences=None):
+        if min_score is None:
+            min_score = PASSWORD_MIN_STRENGTH
+        self.min_score = min_score
+        if words is None and dictionary is None:
+            self.dictionary = dictionary_words
+        else:
+            self.dictionary = shared_validator(
+                DictionaryValidator, words=words, dictionary=dictionary)
+        if sequences is None:
+            sequences = PASSWORD_COMMON_SEQUENCES
+        self.sequences = sequences
+
+    def preload(self):
+        self.dictionary.preload()
+
+    def avalidate(self, value):
+        """
+        Coroutine validating ``value`` on the bounded executor from
+        ``passwords.aio``, since the estimate probes the dictionary for
+        every substring of the password.
+        """
+        from . import aio
+        return aio.run_in_executor(self._check, value)
+
+    def cache_key(self):
+        return "%s|%r|%s|%r" % (super(StrengthValidator, self).cache_key(),
+                                self.min_score, self.dictionary.cache_key(),
+                                tuple(self.sequences))
+
+    def _validate(self, value, stats=None, cancel=None):
+        if stats is not None:
+            start = default_timer()
+            self.dictionary.get_index()
+            stats["load_elapsed"] += default_timer() - start
+        result = strength.estimate(value, self.dictionary.get_index(),
+                                   self.sequences)
+        if result["score"] < self.min_score:
+            raise ValidationError(self.message, code=self.code, params={
+                "score": result["score"],
+                "min_score": self.min_score,
+            })
+
 
 validate_length = LengthValidator(PASSWORD_MIN_LENGTH, PASSWORD_MAX_LENGTH)
 complexity = ComplexityValidator(PASSWORD_COMPLEXITY)
 dictionary_words = DictionaryValidator(dictionary=PASSWORD_DICTIONARY)
 common_sequences = CommonSequenceValidator(PASSWORD_COMMON_SEQUENCES)
+breached_passwords = BreachedPasswordValidator(PASSWORD_BREACH_CORPUS)
+
+# The checks PasswordField runs, and validate_many by default.
+default_validators = [
+    validate_length,
+    common_sequences,
+    dictionary_words,
+    breached_passwords,
+    complexity,
+]
+
+
+def preload(validators=None):
+    """
+    Load the dictionaries and other data used by ``validators``
+    (``default_validators`` if omitted) now. Called before worker processes
+    are forked, it lets them share one copy of the data.
+    """
+    if validators is None:
+        validators = default_validators
+    for validator in validators:
+        if hasattr(validator, "preload"):
+            validator.preload()
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+def shared_validator(cls, **options):
+    """
+    Return the process-wide instance of ``cls`` built with ``options``,
+    creating it on first use, so every caller configuring a check the same
+    way shares one copy of its words and index.
+    """
+    key = (cls, _freeze(options))
+    with _shared_lock:
+        validator = _shared.get(key)
+        if validator is None:
+            validator = _shared[key] = cls(**options)
+        return validator
+
+
+def _run_validators(validators, value):
+    errors = []
+    for validator in validators:
+        try:
+            validator(value)
+        except ValidationError as e:
+            errors.append(e)
+    return errors
+
+
+_worker_validators = None
+
+
+def _init_worker(validators):
+    global _worker_validators
+    _worker_validators = validators
+
+
+def _validate_item(item):
+    index, value = item
+    return index, _run_validators(_worker_validators, value)
+
+
+def validate_many(values, validators=None, processes=None, chunksize=64,
+                  start_method=None):
+    """
+    Validate every password in ``values``, yielding ``(index, errors)`` pairs
+    in input order, where ``errors`` is the list of ``ValidationError``
+    raised by ``validators`` (``default_validators`` if omitted).
+
+    The work is spread over a pool of ``processes`` worker processes, one
+    per CPU by default; pass 0 to validate in this process. Dictionaries are
+    loaded before the pool starts so that, where processes are forked, the
+    workers share the parent's copy. ``start_method`` picks the
+    multiprocessing start method; by default workers are forked on Linux
+    and use the platform default elsewhere, since forking is unsafe with
+    the system frameworks on macOS.
+    """
+    if validators is None:
+        validators = default_validators
+    validators = list(validators)
+
+    if processes == 0:
+        for index, value in enumerate(values):
+            yield index, _run_validators(validators, value)
+        return
+
+    preload(validators)
+
+    if start_method is None and sys.platform.startswith("linux"):
+        start_method = "fork"
+    context = multiprocessing.get_context(start_method)
+    pool = context.Pool(processes, initializer=_init_worker,
+                        initargs=(validators,))
+    try:
+        for result in pool.imap(_validate_item, enumerate(values),
+                                chunksize):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,125 @@
+# coding=utf-8
+"""
+Optional NumPy backend for the similarity scan.
+
+The words of each length bucket of a ``SimilarityIndex`` are packed into a
+2-D array of code points, and the approximate substring dynamic program
+advances one needle character at a time across every candidate of a bucket
+at once. Distances are identical to ``similarity.substring_distance``.
+NumPy is only imported once ``available()`` is first asked, so importing
+the validators stays cheap; without it installed callers keep the
+pure-Python path.
+"""
+from __future__ import unicode_literals
+
+# The numpy module once available() has imported it, None until then or
+# if it is not installed.
+numpy = None
+_imported = False
+
+
+def available():
+    """
+    Whether NumPy is installed, importing it on the first call.
+    """
+    global numpy, _imported
+    if not _imported:
+        try:
+            import numpy as module
+        except ImportError:  # pragma: no cover
+            module = None
+        numpy = module
+        _imported = True
+    return numpy is not None
+
+
+# Buckets with fewer candidates than this are cheaper to score one by one.
+VECTORIZE_MIN_ROWS = 64
+
+
+class BucketMatrices(object):
+    """
+    Code points of the words of an index, one ``(words, length)`` array per
+    length bucket, built on first use.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self._arrays = {}
+        self.nbytes = 0
+
+    def rows(self, start):
+        array = self._arrays.get(start)
+        if array is None:
+            for length, first, stop in self.index.lengths:
+                if first == start:
+                    break
+            words = "".join(self.index.words[start:stop])
+            array = numpy.frombuffer(words.encode("utf-32-le"), dtype="<u4")
+            array = array.reshape(stop - start, length)
+            self._arrays[start] = array
+            self.nbytes += array.nbytes
+        return array
+
+
+def matrices_for(index):
+    if index.matrices is None:
+        index.matrices = BucketMatrices(index)
+    return index.matrices
+
+
+def substring_distances(needle, haystacks, limit=None):
+    """
+    ``substring_distance(needle, haystack, limit=limit)`` for every row of
+    the code point array ``haystacks``, for needles of two or more
+    characters.
+
+    Row ``i`` of the matrix is built from row ``i - 1`` in two vectorized
+    steps: the substitution and deletion moves first, then the insertion
+    moves along the row, which ``D[i][j] = min(t[k] + j - k for k <= j)``
+    turns into a running minimum of ``t[k] - k``. Rows whose smallest cell
+    exceeds ``limit`` can never come back under it and are dropped.
+    """
+    count, n = haystacks.shape
+    m = len(needle)
+    if n == 0:
+        return numpy.full(count, m, dtype=numpy.int64)
+
+    codes = numpy.frombuffer(needle.encode("utf-32-le"), dtype="<u4")
+    offsets = numpy.arange(n + 1, dtype=numpy.int64)
+    alive = numpy.arange(count)
+    row = numpy.zeros((count, n + 1), dtype=numpy.int64)
+    result = numpy.full(count, -1 if limit is None else limit + 1,
+                        dtype=numpy.int64)
+
+    for i, c in enumerate(codes, 1):
+        moves = numpy.empty_like(row)
+        moves[:, 0] = i
+        numpy.minimum(row[:, 1:] + 1,
+                      row[:, :-1] + (haystacks != c),
+                      out=moves[:, 1:])
+        row = numpy.minimum.accumulate(moves - offsets, axis=1) + offsets
+        if limit is not None:
+            keep = row.min(axis=1) <= limit
+            if not keep.all():
+                alive, row, haystacks = alive[keep], row[keep], haystacks[keep]
+                if not len(alive):
+                    return result
+
+    result[alive] = row.min(axis=1)
+    return result
+
+
+def first_within(needle, index, start, ids, limit):
+    """
+    The first of ``ids``, all in the length bucket beginning at ``start``,
+    whose word is within ``limit`` edits of a substring match of
+    ``needle``, or None.
+    """
+    rows = matrices_for(index).rows(start)
+    ids = numpy.asarray(ids)
+    distances = substring_distances(needle, rows[ids - start], limit)
+    hits = numpy.flatnonzero(distances <= limit)
+    if len(hits):
+        return int(ids[hits[0]])
+    return None
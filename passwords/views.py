@@ -0,0 +1,74 @@
+# coding=utf-8
+from __future__ import unicode_literals
+
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_POST
+
+from . import policy
+
+
+PASSWORD_LIVE_SESSIONS = getattr(settings, "PASSWORD_LIVE_SESSIONS", 1000)
+
+# Session key holding the token the state of a session is filed under.
+SESSION_KEY = "_password_live"
+
+
+class LiveStates(object):
+    """
+    LRU of the incremental scans of the passwords being typed, one dict of
+    ``IncrementalScan`` per session token and a lock, since a fast typist
+    can have two requests in flight. Kept in process memory only: a session
+    served by another worker, or evicted, just starts its scans over.
+    """
+
+    def __init__(self, max_size=None):
+        if max_size is None:
+            max_size = PASSWORD_LIVE_SESSIONS
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.pop(token, None)
+            if entry is None:
+                entry = (threading.Lock(), {})
+            self._entries[token] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+states = LiveStates()
+
+
+@require_POST
+def validate_password(request):
+    """
+    Check the ``password`` POSTed by a form as it is being typed against
+    the ``PasswordField`` policy and return ``{"valid": ..., "errors":
+    [...], "codes": [...]}``. Similarity scans advance from the previous
+    request of the same session once they are seeded, so typing on only
+    scores the characters added; the time and work budgets apply.
+    """
+    value = request.POST.get("password", "")
+    token = request.session.get(SESSION_KEY)
+    if token is None:
+        token = request.session[SESSION_KEY] = uuid.uuid4().hex
+    lock, scans = states.get(token)
+    with lock:
+        errors = policy.default_policy.errors(value, scans)
+    return JsonResponse({
+        "valid": not errors,
+        "errors": [message for e in errors for message in e.messages],
+        "codes": [e.code for e in errors],
+    })
@@ -1,4 +1,4 @@
-from setuptools import setup
+from setuptools import find_packages, setup
 
 setup(
     name="django-passwords",
@@ -10,23 +10,23 @@ setup(
     long_description=open("README.rst").read(),
     url="http://github.com/dstufft/django-passwords/",
     license="BSD",
-    packages=[
-        "passwords",
-    ],
+    packages=find_packages(exclude=["tests", "tests.*"]),
     include_package_data=True,
+    python_requires=">=3.7",
     install_requires = [
-        "Django >= 1.3",
+        "Django >= 1.11",
     ],
+    extras_require = {
+        "numpy": ["numpy"],
+    },
     classifiers = [
         "Development Status :: 4 - Beta",
         "Environment :: Web Environment",
         "Intended Audience :: Developers",
         "License :: OSI Approved :: BSD License",
         "Operating System :: OS Independent",
-        "Programming Language :: Python :: 2.6",
-        "Programming Language :: Python :: 2.7",
-        "Programming Language :: Python :: 3.4",
-        "Programming Language :: Python :: 3.5",
+        "Programming Language :: Python :: 3",
+        "Programming Language :: Python :: 3.7",
         "Topic :: Utilities",
         "Framework :: Django",
     ],
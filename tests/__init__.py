@@ -1,7 +1,7 @@
 from django.conf import settings
 import django
 
-settings.configure()
+settings.configure(SECRET_KEY="django-passwords-tests")
 
 try:
     django.setup()
@@ -0,0 +1,59 @@
+# -*- coding: utf8 -*-
+
+from __future__ import unicode_literals
+import asyncio
+import threading
+from django.core.exceptions import ValidationError
+from django.test import override_settings
+from passwords import auth_password_validators, validators
+from unittest import TestCase
+
+
+class AsyncValidationTests(TestCase):
+
+    def test_avalidate_matches_sync_verdicts(self):
+        dv = validators.DictionaryValidator(words=['dragon'])
+        lv = validators.LengthValidator(min_length=8)
+
+        async def check():
+            await dv.avalidate('ljasdfkjhsdfkjhsiudfyisd')
+            with self.assertRaises(ValidationError):
+                await dv.avalidate('Dragon')
+            with self.assertRaises(ValidationError):
+                await lv.avalidate('short')
+
+        asyncio.run(check())
+
+    def test_auth_wrapper(self):
+        with override_settings(PASSWORD_COMPLEXITY={'DIGITS': 1}):
+            wrapper = auth_password_validators.ComplexityValidator()
+
+        async def check():
+            await wrapper.avalidate('abc123')
+            with self.assertRaises(ValidationError):
+                await wrapper.avalidate('abcdef')
+
+        asyncio.run(check())
+
+    def test_cancellation_stops_scan(self):
+        started, stopped = threading.Event(), threading.Event()
+
+        class SlowValidator(validators.DictionaryValidator):
+            def find_match(self, value, cancel=None, stats=None):
+                started.set()
+                if cancel.wait(5):
+                    stopped.set()
+                raise validators.ValidationCancelled()
+
+        sv = SlowValidator(words=['dragon'])
+
+        async def check():
+            task = asyncio.ensure_future(sv.avalidate('password'))
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(check())
+        self.assertTrue(stopped.wait(5))
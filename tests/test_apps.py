@@ -0,0 +1,77 @@
+# -*- coding: utf8 -*-
+
+from __future__ import unicode_literals
+import gc
+import io
+import os
+import shutil
+import tempfile
+import threading
+import passwords
+from django.core.exceptions import ImproperlyConfigured
+from passwords import validators
+from passwords.apps import PasswordsConfig
+from passwords.dictionaries import registry
+from unittest import TestCase
+
+
+class LoadStrategyTests(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'words')
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write('dragon\nmonkey\n')
+        self.path = path
+        self.addCleanup(registry.forget, path)
+
+    def ready(self, strategy):
+        old = validators.PASSWORD_DICTIONARY_LOAD, validators.default_validators
+        validators.PASSWORD_DICTIONARY_LOAD = strategy
+        validators.default_validators = [self.validator]
+        try:
+            PasswordsConfig('passwords', passwords).ready()
+        finally:
+            (validators.PASSWORD_DICTIONARY_LOAD,
+             validators.default_validators) = old
+
+    def test_nothing_loads_on_construction(self):
+        self.validator = validators.DictionaryValidator(dictionary=self.path)
+        self.assertNotIn(self.path, registry)
+        self.ready('lazy')
+        self.assertNotIn(self.path, registry)
+        self.assertEqual(self.validator.find_match('dragon'), 'dragon')
+        self.assertIn(self.path, registry)
+
+    def test_eager_loads_in_ready(self):
+        self.validator = validators.DictionaryValidator(dictionary=self.path,
+                                                        bloom=True)
+        self.ready('eager')
+        self.assertIn(self.path, registry)
+        self.assertIsNotNone(self.validator._bloom)
+
+    def test_preload_freezes_loaded_objects(self):
+        self.validator = validators.DictionaryValidator(words=['dragon'])
+        self.ready('preload')
+        self.assertIsNotNone(self.validator._index)
+        if hasattr(gc, 'freeze'):
+            self.assertGreater(gc.get_freeze_count(), 0)
+            gc.unfreeze()
+
+    def test_unknown_strategy(self):
+        self.validator = validators.DictionaryValidator(words=['dragon'])
+        with self.assertRaises(ImproperlyConfigured):
+            self.ready('sometimes')
+
+    def test_index_is_built_once_across_threads(self):
+        validator = validators.DictionaryValidator(words=['dragon'] * 1000)
+        indexes = []
+        threads = [threading.Thread(
+            target=lambda: indexes.append(validator.get_index()))
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(id(index) for index in indexes)), 1)
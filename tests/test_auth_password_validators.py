@@ -0,0 +1,64 @@
+# -*- coding: utf8 -*-
+
+from __future__ import unicode_literals
+from django.core.exceptions import ValidationError
+from passwords import auth_password_validators, validators
+from unittest import TestCase
+
+
+class AuthPasswordValidatorTests(TestCase):
+
+    def test_length_options(self):
+        wrapper = auth_password_validators.LengthValidator(min_length=10)
+        wrapper.validate('long enough!')
+        with self.assertRaises(ValidationError):
+            wrapper.validate('too short')
+        self.assertIs(auth_password_validators.LengthValidator().validator,
+                      validators.validate_length)
+
+    def test_dictionary_options(self):
+        wrapper = auth_password_validators.DictionaryValidator(
+            words=['nostromo'], threshold=0.8)
+        wrapper.validate('Correct horse 9')
+        with self.assertRaises(ValidationError):
+            wrapper.validate('nostrilomo')
+
+    def test_same_options_share_one_index(self):
+        first = auth_password_validators.DictionaryValidator(
+            words=['nostromo', 'sulaco'], threshold=0.8)
+        second = auth_password_validators.DictionaryValidator(
+            words=['nostromo', 'sulaco'], threshold=0.8)
+        other = auth_password_validators.DictionaryValidator(
+            words=['nostromo'], threshold=0.8)
+        self.assertIs(first.validator, second.validator)
+        self.assertIs(first.validator.get_index(),
+                      second.validator.get_index())
+        self.assertIsNot(first.validator, other.validator)
+
+    def test_defaults_share_the_form_validators(self):
+        self.assertIs(
+            auth_password_validators.DictionaryValidator().validator,
+            validators.dictionary_words)
+        self.assertIs(
+            auth_password_validators.CommonSequenceValidator().validator,
+            validators.common_sequences)
+
+    def test_common_sequence_options(self):
+        wrapper = auth_password_validators.CommonSequenceValidator(min_run=4)
+        self.assertEqual(wrapper.validator.haystacks,
+                         validators.PASSWORD_COMMON_SEQUENCES)
+        with self.assertRaises(ValidationError):
+            wrapper.validate('horse4321staple')
+        self.assertTrue(wrapper.get_help_text())
+
+    def test_user_attribute_similarity(self):
+        class User(object):
+            username = 'bishop341'
+            email = 'bishop@hyperdyne.com'
+
+        wrapper = auth_password_validators.UserAttributeSimilarityValidator(
+            attributes=['username', 'email'], threshold=0.8)
+        wrapper.validate('bishop341', user=None)
+        wrapper.validate('Correct horse 9', user=User())
+        with self.assertRaises(ValidationError):
+            wrapper.validate('Bishop341!', user=User())
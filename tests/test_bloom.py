@@ -0,0 +1,41 @@
+# -*- coding: utf8 -*-
+
+from __future__ import unicode_literals
+import os
+import shutil
+import tempfile
+from passwords.bloom import BloomFilter
+from unittest import TestCase
+
+
+class BloomFilterTests(TestCase):
+
+    words = ['word%d' % i for i in range(2000)]
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter.from_words(self.words, 0.01)
+        for word in self.words:
+            self.assertIn(word, bloom)
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter.from_words(self.words, 0.01)
+        hits = sum('other%d' % i in bloom for i in range(10000))
+        self.assertLess(hits, 300)
+
+    def test_smaller_error_rate_uses_more_bits(self):
+        loose = BloomFilter.from_words(self.words, 0.1)
+        tight = BloomFilter.from_words(self.words, 0.001)
+        self.assertLess(loose.num_bits, tight.num_bits)
+
+    def test_save_and_load(self):
+        bloom = BloomFilter.from_words(self.words, 0.01)
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'words.bloom')
+        bloom.save(path)
+        loaded = BloomFilter.load(path)
+        self.assertEqual((loaded.num_bits, loaded.num_hashes),
+                         (bloom.num_bits, bloom.num_hashes))
+        for word in self.words:
+            self.assertIn(word, loaded)
+        self.assertEqual(bytes(loaded.bits), bytes(bloom.bits))
@@ -0,0 +1,78 @@
+# -*- coding: utf8 -*-
+
+from __future__ import unicode_literals
+from django.core.exceptions import ValidationError
+from django.utils import translation
+from passwords import cache, validators
+from unittest import TestCase
+
+
+class VerdictCacheTests(TestCase):
+
+    def setUp(self):
+        self.cache = cache.VerdictCache(max_size=2, ttl=60)
+        self.calls = []
+
+    def validate(self, value):
+        self.calls.append(value)
+        if value == 'bad':
+            raise ValidationError('nope %(x)s', code='bad', params={'x': 1})
+
+    def test_caches_passes_and_failures(self):
+        for _ in range(3):
+            self.cache.check('cfg', 'good', self.validate)
+            with self.assertRaises(ValidationError) as cm:
+                self.cache.check('cfg', 'bad', self.validate)
+        self.assertEqual(self.calls, ['good', 'bad'])
+        self.assertEqual(cm.exception.code, 'bad')
+        self.assertEqual(cm.exception.messages, ['nope 1'])
+
+    def test_keyed_by_configuration(self):
+        self.cache.check('one', 'good', self.validate)
+        self.cache.check('two', 'good', self.validate)
+        self.assertEqual(self.calls, ['good', 'good'])
+
+    def test_never_stores_plaintext(self):
+        self.cache.check('cfg', 'good', self.validate)
+        for key, entry in self.cache._entries.items():
+            self.assertNotIn(b'good', key)
+            self.assertNotIn('good', repr(entry))
+
+    def test_expires_and_evicts(self):
+        self.cache.check('cfg', 'a', self.validate)
+        self.cache.check('cfg', 'b', self.validate)
+        self.cache.check('cfg', 'c', self.validate)
+        self.cache.check('cfg', 'a', self.validate)
+        self.assertEqual(self.calls, ['a', 'b', 'c', 'a'])
+
+        self.cache.ttl = -1
+        self.cache.check('cfg', 'd', self.validate)
+        self.cache.check('cfg', 'd', self.validate)
+        self.assertEqual(self.calls[-2:], ['d', 'd'])
+
+    def test_disabled_by_default(self):
+        self.cache.max_size = 0
+        self.cache.check('cfg', 'good', self.validate)
+        self.cache.check('cfg', 'good', self.validate)
+        self.assertEqual(self.calls, ['good', 'good'])
+
+    def test_keyed_by_active_language(self):
+        cv = validators.ComplexityValidator(dict(DIGITS=1))
+        with translation.override('de'):
+            german = cv.cache_key()
+        with translation.override('en'):
+            english = cv.cache_key()
+        self.assertNotEqual(german, english)
+
+    def test_validators_consult_shared_cache(self):
+        dv = validators.DictionaryValidator(words=['dragon'])
+        scans = []
+        dv.find_match = lambda value, *args: scans.append(value)
+        cache.verdicts.max_size = 10
+        try:
+            dv('something long')
+            dv('something long')
+        finally:
+            cache.verdicts.max_size = 0
+            cache.verdicts.clear()
+        self.assertEqual(scans, ['something long'])
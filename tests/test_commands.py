@@ -0,0 +1,119 @@
+# -*- coding: utf8 -*-
+
+from __future__ import unicode_literals
+import base64
+import io
+import json
+import os
+import shutil
+import tempfile
+from django.core.management import call_command
+from passwords import policy, validators
+from passwords.bloom import BloomFilter
+from passwords.breach import BreachCorpus
+from passwords.management.commands import (compile_breach_corpus,
+                                           compile_password_dictionary,
+                                           export_password_policy)
+from passwords.similarity import SimilarityIndex
+from unittest import TestCase
+
+
+class CompilePasswordDictionaryTests(TestCase):
+
+    def test_compiles_word_list(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        source = os.path.join(tmp, 'words.txt')
+        output = os.path.join(tmp, 'words.idx')
+        with io.open(source, 'w', encoding='utf-8') as f:
+            f.write('Monkey\nmonkey\ndragon\n\nletmein\n')
+
+        stdout = io.StringIO()
+        call_command(compile_password_dictionary.Command(), output,
+                     source=source, stdout=stdout)
+
+        index = SimilarityIndex.load(output)
+        self.assertEqual(list(index.words), ['dragon', 'monkey', 'letmein'])
+        self.assertIn('3 words', stdout.getvalue())
+
+    def test_compiles_compressed_lists_and_globs(self):
+        import bz2
+        import gzip
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        with gzip.open(os.path.join(tmp, 'a.txt.gz'), 'wt',
+                       encoding='latin-1') as f:
+            f.write('Café\nab\ndragon\n')
+        with bz2.open(os.path.join(tmp, 'b.txt.bz2'), 'wt',
+                      encoding='latin-1') as f:
+            f.write('dragon\nmonkey\n')
+        output = os.path.join(tmp, 'words.idx')
+
+        call_command(compile_password_dictionary.Command(), output,
+                     source=[os.path.join(tmp, '*.txt.*')],
+                     encoding='latin-1', min_length=3, stdout=io.StringIO())
+
+        index = SimilarityIndex.load(output)
+        self.assertEqual(list(index.words), ['café', 'dragon', 'monkey'])
+
+
+class CompileBreachCorpusTests(TestCase):
+
+    def test_converts_hash_dump(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        source = os.path.join(tmp, 'pwned.txt')
+        output = os.path.join(tmp, 'pwned.bin')
+        with open(source, 'wb') as f:
+            # sha1('password') and sha1('letmein')
+            f.write(b'5BAA61E4C9B93F3F0682250B6CF8331B7EE68FD8:3730471\n'
+                    b'B7A875FC1EA228B9061041B7CEC4BD3C52AB3CE3:126\n')
+
+        stdout = io.StringIO()
+        call_command(compile_breach_corpus.Command(), source, output,
+                     hash_bytes=10, stdout=stdout)
+
+        corpus = BreachCorpus(output)
+        self.assertEqual(corpus.hash_bytes, 10)
+        self.assertIn('password', corpus)
+        self.assertIn('letmein', corpus)
+        self.assertNotIn('letmeout', corpus)
+        self.assertIn('Wrote 2 hashes', stdout.getvalue())
+
+
+class ExportPasswordPolicyTests(TestCase):
+
+    def test_exports_client_rules(self):
+        chain = [
+            validators.LengthValidator(min_length=8),
+            validators.DictionaryValidator(words=['Dragon', 'monkey']),
+            validators.CommonSequenceValidator(['abcdef'], min_run=4),
+            validators.BreachedPasswordValidator(),
+        ]
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        output = os.path.join(tmp, 'policy.json')
+        old, policy.default_policy = (policy.default_policy,
+                                      policy.PasswordPolicy(chain))
+        try:
+            stdout = io.StringIO()
+            call_command(export_password_policy.Command(), output,
+                         stdout=stdout)
+        finally:
+            policy.default_policy = old
+
+        with open(output) as f:
+            exported = json.load(f)
+        self.assertEqual(exported['version'], policy.POLICY_EXPORT_VERSION)
+        self.assertIn(exported['digest'][:12], stdout.getvalue())
+        rules = dict((rule['type'], rule) for rule in exported['rules'])
+        self.assertEqual(sorted(rules),
+                         ['common_sequence', 'dictionary_word', 'length'])
+        self.assertEqual(rules['length']['min_length'], 8)
+        self.assertEqual(rules['common_sequence']['min_run'], 4)
+
+        rule = rules['dictionary_word']
+        bloom = BloomFilter(rule['num_bits'], rule['num_hashes'],
+                            bytearray(base64.b64decode(rule['bits'])))
+        self.assertIn('dragon', bloom)
+        self.assertIn('monkey', bloom)
@@ -0,0 +1,91 @@
+# -*- coding: utf8 -*-
+
+from __future__ import unicode_literals
+import io
+import os
+import shutil
+import tempfile
+from django.core.exceptions import ImproperlyConfigured
+from passwords import validators
+from passwords.dictionaries import DictionaryRegistry, iter_words
+from unittest import TestCase
+
+
+class DictionaryRegistryTests(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def write(self, name, words, mtime=None):
+        path = os.path.join(self.tmp, name)
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(words))
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_shares_one_index_per_path(self):
+        registry = DictionaryRegistry()
+        path = self.write('words', ['dragon', 'monkey'])
+        self.assertIs(registry.get(path), registry.get(path))
+
+    def test_reloads_when_file_changes(self):
+        registry = DictionaryRegistry(reload_interval=0)
+        path = self.write('words', ['dragon'], mtime=1000000)
+        self.assertEqual(list(registry.get(path).words), ['dragon'])
+
+        self.write('words', ['dragon', 'monkey'], mtime=2000000)
+        self.assertEqual(list(registry.get(path).words), ['dragon', 'monkey'])
+
+    def test_waits_for_reload_interval(self):
+        registry = DictionaryRegistry(reload_interval=3600)
+        path = self.write('words', ['dragon'], mtime=1000000)
+        index = registry.get(path)
+        self.write('words', ['monkey'], mtime=2000000)
+        self.assertIs(registry.get(path), index)
+
+    def test_evicts_least_recently_used(self):
+        first = self.write('first', ['dragon'])
+        second = self.write('second', ['monkey'])
+        third = self.write('third', ['letmein'])
+
+        registry = DictionaryRegistry()
+        registry.get(first)
+        registry.max_size = registry.size * 2.5
+        registry.get(second)
+        registry.get(first)
+        registry.get(third)
+
+        self.assertIn(first, registry)
+        self.assertNotIn(second, registry)
+        self.assertIn(third, registry)
+
+    def test_streams_compressed_lists(self):
+        import lzma
+        path = os.path.join(self.tmp, 'words.xz')
+        with lzma.open(path, 'wt', encoding='utf-8') as f:
+            f.write('  dragon \n\nmonkey\nx\n')
+        self.assertEqual(list(iter_words(path, min_length=2)),
+                         ['dragon', 'monkey'])
+
+    def test_multiple_lists_and_globs(self):
+        registry = DictionaryRegistry(reload_interval=0)
+        first = self.write('first.txt', ['dragon'], mtime=1000000)
+        self.write('second.txt', ['monkey'], mtime=1000000)
+        pattern = os.path.join(self.tmp, '*.txt')
+        self.assertEqual(list(registry.get([first, pattern]).words),
+                         ['dragon', 'monkey'])
+        self.assertIn([first, pattern], registry)
+
+        # A new file matching the glob is picked up on the next check.
+        self.write('third.txt', ['letmein'], mtime=1000000)
+        self.assertEqual(list(registry.get([first, pattern]).words),
+                         ['dragon', 'monkey', 'letmein'])
+
+    def test_glob_matching_nothing_is_an_error(self):
+        pattern = os.path.join(self.tmp, 'missing', '*.txt')
+        with self.assertRaises(ImproperlyConfigured):
+            DictionaryRegistry().get(pattern)
+        with self.assertRaises(ImproperlyConfigured):
+            validators.DictionaryValidator(dictionary=pattern)('password')
@@ -4,7 +4,7 @@ from __future__ import unicode_literals
 from django.core.exceptions import ValidationError
 from django.forms import PasswordInput, TimeInput, CharField
 from passwords import fields, validators
-from unittest import TestCase
+from unittest import TestCase, mock
 
 
 class TestFields(TestCase):
@@ -23,6 +23,31 @@ class TestFields(TestCase):
         self.assertTrue(
             'minlength' in p.widget.attrs or 'pattern' in p.widget.attrs)
 
+    def test_policy_asset(self):
+        self.assertNotIn('data-password-policy',
+                         fields.PasswordField().widget.attrs)
+
+        old, fields.PASSWORD_POLICY_ASSET = (fields.PASSWORD_POLICY_ASSET,
+                                             'passwords/policy.json')
+        calls = []
+
+        def static(path):
+            calls.append(path)
+            return '/static/' + path
+
+        try:
+            with mock.patch.object(fields, 'static', static):
+                p = fields.PasswordField()
+                # A manifest storage can't resolve the asset before it has
+                # been exported, so nothing is looked up until rendering.
+                self.assertEqual(calls, [])
+        finally:
+            fields.PASSWORD_POLICY_ASSET = old
+        self.assertEqual(str(p.widget.attrs['data-password-policy']),
+                         '/static/passwords/policy.json')
+        self.assertEqual(calls, ['passwords/policy.json'])
+        self.assertIn('passwords/password-policy.js', str(p.widget.media))
+
     def test_default_validation(self):
         # because our tests/__init__ has not provided any configuration to
         # Django, we get default behaviour here.
@@ -43,3 +68,16 @@ class TestFields(TestCase):
             p.clean('a')  # too short
         with self.assertRaises(ValidationError):
             p.clean('nostrilomo')  # too much like nostromo
+
+    def test_live_validation_url(self):
+        from django.test import override_settings
+        old, fields.PASSWORD_LIVE_VALIDATION_URL = (
+            fields.PASSWORD_LIVE_VALIDATION_URL, 'validate')
+        try:
+            p = fields.PasswordField()
+        finally:
+            fields.PASSWORD_LIVE_VALIDATION_URL = old
+        with override_settings(ROOT_URLCONF='passwords.urls'):
+            self.assertEqual(str(p.widget.attrs['data-password-live']),
+                             '/validate/')
+        self.assertIn('passwords/password-policy.js', str(p.widget.media))
@@ -0,0 +1,75 @@
+# -*- coding: utf8 -*-
+
+from __future__ import unicode_literals
+import asyncio
+from django.core.exceptions import ValidationError
+from passwords import validators
+from passwords.auth_password_validators import PasswordPolicyValidator
+from passwords.policy import PasswordPolicy
+from passwords.similarity import NormalizedPassword
+from unittest import TestCase
+
+
+class RecordingValidator(validators.BaseValidator):
+
+    def __init__(self, cost, calls, fail=False):
+        self.cost = cost
+        self.calls = calls
+        self.fail = fail
+
+    def _validate(self, value, stats=None, cancel=None):
+        self.calls.append((self.cost, value))
+        if self.fail:
+            raise ValidationError("failed %s" % self.cost, code="c%s" % self.cost)
+
+
+class PasswordPolicyTests(TestCase):
+
+    def test_runs_cheapest_first_and_collects_all(self):
+        calls = []
+        chain = [RecordingValidator(4, calls, fail=True),
+                 RecordingValidator(0, calls, fail=True),
+                 RecordingValidator(2, calls)]
+        policy = PasswordPolicy(chain, short_circuit=False)
+        errors = policy.errors('Secret')
+        self.assertEqual([cost for cost, _ in calls], [0, 2, 4])
+        self.assertEqual([e.code for e in errors], ['c0', 'c4'])
+        with self.assertRaises(ValidationError) as cm:
+            policy('Secret')
+        self.assertEqual(cm.exception.messages, ['failed 0', 'failed 4'])
+
+    def test_short_circuit_skips_expensive_checks(self):
+        calls = []
+        chain = [RecordingValidator(4, calls),
+                 RecordingValidator(0, calls, fail=True)]
+        policy = PasswordPolicy(chain, short_circuit=True)
+        self.assertEqual([e.code for e in policy.errors('x')], ['c0'])
+        self.assertEqual([cost for cost, _ in calls], [0])
+
+    def test_password_is_normalized_once(self):
+        calls = []
+        PasswordPolicy([RecordingValidator(0, calls)])('PassWord')
+        value = calls[0][1]
+        self.assertIsInstance(value, NormalizedPassword)
+        self.assertEqual(value, 'PassWord')
+        self.assertEqual(value.normalized(), 'password')
+        self.assertIs(value.normalized(), value.normalized())
+
+    def test_default_chain_rejects_like_separate_validators(self):
+        policy = PasswordPolicy([
+            validators.LengthValidator(min_length=8),
+            validators.DictionaryValidator(words=['nostromo']),
+        ], short_circuit=True)
+        with self.assertRaises(ValidationError) as cm:
+            policy('NOSTROMO')
+        self.assertEqual(cm.exception.error_list[0].code, 'dictionary_word')
+        policy('correct horse')
+
+    def test_auth_wrapper(self):
+        wrapper = PasswordPolicyValidator(short_circuit=True)
+        self.assertTrue(wrapper.policy.short_circuit)
+        wrapper.validate('Correct horse 9')
+        with self.assertRaises(ValidationError):
+            wrapper.validate('abc')
+        with self.assertRaises(ValidationError):
+            asyncio.run(wrapper.avalidate('abc'))
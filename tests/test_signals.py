@@ -0,0 +1,172 @@
+# -*- coding: utf8 -*-
+
+from __future__ import unicode_literals
+import gc
+from django.core.exceptions import ValidationError
+from passwords import cache, validators
+from passwords.signals import budget_exhausted, validation_finished
+from unittest import TestCase
+
+
+class ValidationFinishedTests(TestCase):
+
+    def setUp(self):
+        self.reports = []
+        validation_finished.connect(self.receiver)
+
+    def tearDown(self):
+        validation_finished.disconnect(self.receiver)
+
+    def receiver(self, sender, **kwargs):
+        self.reports.append(kwargs)
+
+    def test_reports_similarity_scan(self):
+        words = ['dragon', 'monkey', 'sunshine', 'letmein', 'shadow']
+        dv = validators.DictionaryValidator(words=words)
+
+        dv('ljasdfkjhsdfkjhsiudfyisd')
+        with self.assertRaises(ValidationError):
+            dv('dragon')
+
+        accepted, rejected = self.reports
+        self.assertIs(accepted['validator'], dv)
+        self.assertIsNone(accepted['code'])
+        self.assertEqual(accepted['scanned'] + accepted['pruned'], 5)
+        self.assertGreaterEqual(accepted['elapsed'], accepted['load_elapsed'])
+        self.assertFalse(accepted['cached'])
+        self.assertEqual(rejected['code'], 'dictionary_word')
+        self.assertGreaterEqual(rejected['scanned'], 1)
+
+    def test_reports_cache_hits(self):
+        cv = validators.ComplexityValidator(dict(DIGITS=1))
+        cache.verdicts.max_size = 10
+        try:
+            for _ in range(2):
+                with self.assertRaises(ValidationError):
+                    cv('no digits')
+        finally:
+            cache.verdicts.max_size = 0
+            cache.verdicts.clear()
+
+        self.assertEqual([r['cached'] for r in self.reports], [False, True])
+        self.assertEqual([r['code'] for r in self.reports],
+                         ['complexity', 'complexity'])
+
+    def test_broken_receiver_does_not_fail_validation(self):
+        def broken(sender, **kwargs):
+            raise RuntimeError('monitoring is down')
+
+        validation_finished.connect(broken)
+        try:
+            validators.LengthValidator(min_length=2)('long enough')
+        finally:
+            validation_finished.disconnect(broken)
+        self.assertEqual(len(self.reports), 1)
+
+    def test_dead_receivers_skip_measuring(self):
+        validation_finished.disconnect(self.receiver)
+        measured = []
+
+        class Validator(validators.LengthValidator):
+            def _measure(self, value, cancel=None):
+                measured.append(value)
+                return super(Validator, self)._measure(value, cancel)
+
+        def receiver(sender, **kwargs):
+            pass
+
+        validation_finished.connect(receiver)
+        del receiver
+        gc.collect()
+        Validator(min_length=2)('long enough')
+        self.assertEqual(measured, [])
+
+
+class ExplainTests(TestCase):
+
+    def test_explain_passing_password(self):
+        dv = validators.DictionaryValidator(words=['dragon', 'monkey'])
+        report = dv.explain('ljasdfkjhsdfkjhsiudfyisd')
+        self.assertTrue(report['valid'])
+        self.assertIsNone(report['code'])
+        self.assertEqual(report['messages'], [])
+        self.assertEqual(report['scanned'] + report['pruned'], 2)
+        self.assertGreaterEqual(report['elapsed'], 0)
+
+    def test_explain_rejected_password(self):
+        dv = validators.DictionaryValidator(words=['dragon', 'monkey'])
+        report = dv.explain('Dragon')
+        self.assertFalse(report['valid'])
+        self.assertEqual(report['code'], 'dictionary_word')
+        self.assertEqual(report['messages'], ['Based on a dictionary word'])
+        self.assertGreaterEqual(report['scanned'], 1)
+
+        report = validators.LengthValidator(min_length=8).explain('short')
+        self.assertEqual(report['code'], 'length')
+
+
+class BudgetTests(TestCase):
+
+    def setUp(self):
+        self.reports = []
+        budget_exhausted.connect(self.receiver)
+        words = ['word%04d' % i for i in range(500)] + ['dragonfly']
+        self.dv = validators.DictionaryValidator(words=words, threshold=0.5)
+        self.dv.work_budget = 1
+
+    def tearDown(self):
+        budget_exhausted.disconnect(self.receiver)
+
+    def receiver(self, sender, **kwargs):
+        self.reports.append(kwargs)
+
+    def test_likeliest_candidates_are_scored_first(self):
+        # The one word scored within budget is the one the needle starts
+        # with, not the first of the index.
+        with self.assertRaises(ValidationError):
+            self.dv('dragonfly77')
+        self.assertEqual(self.reports, [])
+
+    def test_accept_policy(self):
+        self.dv('zzword12zz')
+        report, = self.reports
+        self.assertIs(report['validator'], self.dv)
+        self.assertEqual(report['policy'], 'accept')
+        self.assertEqual(report['scanned'], 1)
+
+    def test_reject_policy(self):
+        self.dv.budget_policy = 'reject'
+        with self.assertRaises(ValidationError) as cm:
+            self.dv('zzword12zz')
+        self.assertEqual(cm.exception.code, 'dictionary_word')
+        self.assertEqual(len(self.reports), 1)
+
+    def test_exact_policy(self):
+        self.dv.budget_policy = 'exact'
+        self.dv('zzword12zz')
+        self.dv.work_budget = 0
+        with self.assertRaises(ValidationError):
+            self.dv('word0012')
+        self.assertEqual(len(self.reports), 2)
+
+    def test_degraded_verdicts_are_not_cached(self):
+        finished = []
+
+        def receiver(sender, **kwargs):
+            finished.append(kwargs)
+
+        self.dv.budget_policy = 'reject'
+        validation_finished.connect(receiver)
+        cache.verdicts.max_size = 10
+        try:
+            for _ in range(2):
+                with self.assertRaises(ValidationError):
+                    self.dv('zzword12zz')
+        finally:
+            validation_finished.disconnect(receiver)
+            cache.verdicts.max_size = 0
+            cache.verdicts.clear()
+
+        self.assertEqual([r['cached'] for r in finished], [False, False])
+        self.assertEqual([r['degraded'] for r in finished], [True, True])
+        self.assertEqual(len(self.reports), 2)
@@ -0,0 +1,83 @@
+# -*- coding: utf8 -*-
+
+from __future__ import unicode_literals
+import asyncio
+import threading
+from django.core.exceptions import ValidationError
+from passwords import strength, validators
+from passwords.auth_password_validators import StrengthValidator
+from passwords.similarity import SimilarityIndex
+from unittest import TestCase
+
+
+class EstimateTests(TestCase):
+
+    def setUp(self):
+        self.index = SimilarityIndex.from_haystacks(
+            ['password', 'dragon', 'correct', 'horse', 'battery', 'staple'] +
+            ['filler%d' % i for i in range(20000)])
+
+    def estimate(self, value):
+        return strength.estimate(value, self.index,
+                                 validators.COMMON_SEQUENCES)
+
+    def patterns(self, value):
+        return [(m.pattern, m.token) for m in self.estimate(value)['sequence']]
+
+    def test_decomposition(self):
+        self.assertEqual(self.patterns('Password1'),
+                         [('dictionary', 'Password'), ('bruteforce', '1')])
+        self.assertEqual(self.patterns('dragon1985'),
+                         [('dictionary', 'dragon'), ('date', '1985')])
+        self.assertEqual(self.patterns('zyxwvu'), [('sequence', 'zyxwvu')])
+        self.assertEqual(self.patterns('aaaaaa'), [('repeat', 'aaaaaa')])
+        self.assertEqual(self.patterns('12/05/1990'),
+                         [('date', '12/05/1990')])
+
+    def test_scores(self):
+        self.assertEqual(self.estimate('')['score'], 0)
+        self.assertEqual(self.estimate('qwerty')['score'], 0)
+        self.assertLessEqual(self.estimate('password')['score'], 1)
+        self.assertEqual(self.estimate('x9#Lq!v2Zp')['score'], 4)
+        self.assertEqual(self.estimate('correcthorsebatterystaple')['score'], 4)
+
+    def test_matches_cover_the_password(self):
+        for value in ('Tr0ub4dor&3', 'abc-dragon-2019', 'aaaXYZqwe!!'):
+            parts = self.estimate(value)['sequence']
+            self.assertEqual(''.join(m.token for m in parts), value)
+
+
+class StrengthValidatorTests(TestCase):
+
+    def test_min_score(self):
+        sv = validators.StrengthValidator(min_score=3, words=['dragon'])
+        sv('x9#Lq!v2Zp')
+        with self.assertRaises(ValidationError) as cm:
+            sv('Dragon2019')
+        self.assertEqual(cm.exception.code, 'weak')
+        self.assertEqual(cm.exception.params['min_score'], 3)
+        validators.StrengthValidator(min_score=0, words=['dragon'])('dragon')
+
+    def test_auth_wrapper(self):
+        wrapper = StrengthValidator(min_score=2)
+        wrapper.validate('correct horse battery staple')
+        with self.assertRaises(ValidationError):
+            wrapper.validate('abcdef')
+
+    def test_avalidate_runs_on_the_executor(self):
+        threads = []
+
+        class RecordingValidator(validators.StrengthValidator):
+            def _validate(self, value, stats=None, cancel=None):
+                threads.append(threading.current_thread())
+                super(RecordingValidator, self)._validate(value, stats,
+                                                          cancel)
+
+        sv = RecordingValidator(min_score=3, words=['dragon'])
+
+        async def check():
+            with self.assertRaises(ValidationError):
+                await sv.avalidate('Dragon2019')
+
+        asyncio.run(check())
+        self.assertIsNot(threads[0], threading.current_thread())
@@ -1,8 +1,15 @@
 # -*- coding: utf8 -*-
 
 from __future__ import unicode_literals
+import binascii
+import os
+import random
+import shutil
+import tempfile
 from django.core.exceptions import ValidationError
-from passwords import validators
+from passwords import similarity, validators
+from passwords.breach import BreachCorpus, compile_corpus, password_hash
+from passwords.similarity import SimilarityIndex, substring_distance
 from unittest import TestCase
 from six import assertRaisesRegex
 
@@ -254,3 +261,405 @@ class DictionaryValidator(ValidatorTestCase):
         self.assertValid(dv, self.different)
         self.assertValid(dv, self.vsimilar)
         self.assertInvalid(dv, self.same, 'dictionary word')
+
+    def test_bloom_fast_path(self):
+        dv = validators.DictionaryValidator(words=['common', 'words'],
+                                            bloom=True)
+        dv.fuzzy_substring = None  # exact hits never reach the fuzzy scan
+        self.assertInvalid(dv, 'Common', 'dictionary word')
+        self.assertEqual(dv.find_match('WORDS'), 'words')
+
+        dv = validators.DictionaryValidator(words=['common', 'words'],
+                                            bloom=True, threshold=0.8)
+        self.assertValid(dv, self.different)
+        self.assertInvalid(dv, 'commons', 'dictionary word')
+
+    def test_bloom_variants(self):
+        dv = validators.DictionaryValidator(words=['dragon'], bloom=True,
+                                            threshold=1.0)
+        self.assertValid(dv, 'dr@g0n')
+        self.assertValid(dv, 'dragon2024!')
+
+        dv = validators.DictionaryValidator(words=['dragon'], bloom=True,
+                                            bloom_variants=True,
+                                            threshold=1.0)
+        self.assertInvalid(dv, 'dr@g0n', 'dictionary word')
+        self.assertInvalid(dv, '!!dragon2024!', 'dictionary word')
+        self.assertInvalid(dv, 'NOGARD', 'dictionary word')
+        self.assertValid(dv, 'dragonfly')
+
+    def test_unicode_and_leetspeak_normalization(self):
+        dv = validators.DictionaryValidator(words=['STRASSE', 'password'],
+                                            threshold=1.0)
+        self.assertInvalid(dv, 'Straße', 'dictionary word')
+        self.assertInvalid(dv, 'ＰＡＳＳＷＯＲＤ', 'dictionary word')
+        self.assertValid(dv, 'p@ssw0rd')
+
+        dv = validators.DictionaryValidator(words=['password'],
+                                            threshold=1.0, leetspeak=True)
+        self.assertEqual(dv.get_index().normalization,
+                         similarity.NORMALIZE_LEETSPEAK)
+        self.assertInvalid(dv, 'P@$$W0RD', 'dictionary word')
+
+
+class SimilarityErrorTests(ValidatorTestCase):
+
+    def test_error_carries_only_the_match(self):
+        words = ['word%d' % i for i in range(1000)] + ['password']
+        bv = validators.BaseSimilarityValidator(words, threshold=0.8)
+        bv.get_index()
+
+        class Untouchable(list):
+            def __iter__(self):
+                raise AssertionError('haystacks listed in the error')
+        bv.haystacks = Untouchable()
+
+        with self.assertRaises(ValidationError) as cm:
+            bv('Passw0rd')
+        error = cm.exception
+        self.assertEqual(error.code, 'similarity')
+        self.assertEqual(error.params['haystacks'], 'password')
+        self.assertAlmostEqual(error.params['similarity'], 7 / 8)
+        self.assertEqual(error.messages, ['Too Similar to [password]'])
+
+    def test_dictionary_errors_keep_their_message(self):
+        dv = validators.DictionaryValidator(words=['dragon'], bloom=True)
+        with self.assertRaises(ValidationError) as cm:
+            dv('DRAGON')
+        self.assertEqual(cm.exception.messages, ['Based on a dictionary word'])
+        self.assertEqual(cm.exception.params,
+                         {'haystacks': 'dragon', 'similarity': 1.0})
+
+
+class SimilarityIndexTests(ValidatorTestCase):
+
+    def naive_verdict(self, validator, value):
+        for haystack in validator.haystacks:
+            if validator.is_similar(value, haystack):
+                return True
+        return False
+
+    def test_index_agrees_with_full_scan(self):
+        rng = random.Random(1234)
+        alphabet = 'abcdeXYZ12'
+        words = [''.join(rng.choice(alphabet)
+                         for _ in range(rng.randint(1, 14)))
+                 for _ in range(120)]
+        for threshold in (0.0, 0.3, 0.6, 0.75, 0.9, 1.0):
+            dv = validators.DictionaryValidator(words=words,
+                                                threshold=threshold)
+            for _ in range(60):
+                value = ''.join(rng.choice(alphabet)
+                                for _ in range(rng.randint(2, 20)))
+                self.assertEqual(dv.find_match(value) is not None,
+                                 self.naive_verdict(dv, value),
+                                 (value, threshold))
+
+    def live_match(self, validator, value, scans):
+        try:
+            validator.validate_incremental(value, scans)
+        except ValidationError as e:
+            return e.params['haystacks']
+        return None
+
+    def test_incremental_scan_agrees_with_full_scan(self):
+        rng = random.Random(4321)
+        alphabet = 'abcdeXYZ12'
+        words = [''.join(rng.choice(alphabet)
+                         for _ in range(rng.randint(1, 14)))
+                 for _ in range(120)]
+        for threshold in (0.0, 0.3, 0.6, 0.75, 0.9, 1.0):
+            dv = validators.DictionaryValidator(words=words,
+                                                threshold=threshold)
+            scans = {}
+            value = ''
+            for _ in range(80):
+                # Mostly typing on, sometimes deleting or starting over.
+                roll = rng.random()
+                if roll < 0.1 or len(value) > 20:
+                    value = ''
+                elif roll < 0.2:
+                    value = value[:-1]
+                else:
+                    value += rng.choice(alphabet)
+                if len(value) < 2:
+                    continue
+                self.assertEqual(self.live_match(dv, value, scans),
+                                 dv.find_match(value), (value, threshold))
+
+    def test_incremental_scan_drops_hopeless_words(self):
+        index = SimilarityIndex.from_haystacks(['dragon', 'monkey', 'abc'])
+        scan = similarity.IncrementalScan(index, 0.9)
+        # Too short for the q-gram filter to narrow anything down.
+        scan.seed('dr')
+        self.assertFalse(scan.extends('dra'))
+        scan.seed('dra')
+        self.assertEqual([index.words[i] for i in scan.ids], ['dragon'])
+        self.assertTrue(scan.extends('drag'))
+        self.assertEqual(scan.find('drag'), 'dragon')
+        self.assertIsNone(scan.find('dragonfly'))
+        self.assertEqual(scan.ids, [])
+        self.assertFalse(scan.extends('monk'))
+
+    def test_incremental_scan_honours_work_budget(self):
+        def check(work):
+            if work >= 1:
+                raise validators.BudgetExhausted(work, 0.0)
+
+        index = SimilarityIndex.from_haystacks(
+            ['word%04d' % i for i in range(500)])
+        scan = similarity.IncrementalScan(index, 0.75)
+        with self.assertRaises(validators.BudgetExhausted):
+            scan.seed('zzwordxxq', check)
+        self.assertFalse(scan.extends('zzwordxxqq'))
+
+        dv = validators.DictionaryValidator(words=index.words,
+                                            threshold=0.75)
+        dv.work_budget = 1
+        dv.budget_policy = 'reject'
+        with self.assertRaises(ValidationError):
+            dv.validate_incremental('zzwordxxq', {})
+
+    def test_candidates_prune_unrelated_words(self):
+        index = SimilarityIndex.from_haystacks(
+            ['Password', 'password', 'dragon', 'monkey', 'sunshine'])
+        self.assertEqual(len(index), 4)
+        ids = index.candidates('passw0rd', 0.8)
+        self.assertEqual([index.words[i] for i in ids], ['password'])
+
+    def test_mask_cache_is_bounded(self):
+        index = SimilarityIndex.from_haystacks(
+            ['word%d' % i for i in range(50)])
+        for i in range(len(index)):
+            index.masks(i)
+        self.assertGreater(index.masks_nbytes, 0)
+
+        bounded = SimilarityIndex.from_haystacks(index.words)
+        old, similarity.MASK_CACHE_SIZE = similarity.MASK_CACHE_SIZE, 10
+        try:
+            for i in range(len(bounded)):
+                bounded.masks(i)
+        finally:
+            similarity.MASK_CACHE_SIZE = old
+        self.assertEqual(len(bounded._masks), 10)
+        self.assertLess(bounded.masks_nbytes, index.masks_nbytes)
+
+    def test_compiled_index_round_trip(self):
+        words = ['Password', 'password', 'dragon', 'monkey', 'ünïcode', 'ab']
+        index = SimilarityIndex.from_haystacks(words)
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'words.idx')
+        index.save(path)
+
+        loaded = SimilarityIndex.load(path)
+        self.assertEqual(list(loaded.words), list(index.words))
+        self.assertEqual(loaded.lengths, index.lengths)
+        for needle in ('passw0rd', 'unicode', 'dragons', 'zzzzzz'):
+            self.assertEqual(loaded.candidates(needle, 0.7),
+                             index.candidates(needle, 0.7))
+
+        dv = validators.DictionaryValidator(dictionary=path)
+        self.assertInvalid(dv, 'Dragon', 'dictionary word')
+        self.assertValid(dv, 'ljasdfkjhsdfkjhsiudfyisd')
+
+    def test_compiled_index_records_normalization(self):
+        index = SimilarityIndex.from_haystacks(
+            ['dragon'], similarity.NORMALIZE_LEETSPEAK)
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'words.idx')
+        index.save(path)
+        self.assertEqual(SimilarityIndex.load(path).normalization,
+                         similarity.NORMALIZE_LEETSPEAK)
+
+        # The compiled header wins over the validator's own setting.
+        dv = validators.DictionaryValidator(dictionary=path, threshold=1.0)
+        self.assertInvalid(dv, 'DR4G0N', 'dictionary word')
+
+    def test_loads_version_1_files(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'words.idx')
+        SimilarityIndex.from_haystacks(['dragon']).save(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        fields = similarity.COMPILED_HEADER.unpack_from(data, 0)
+        with open(path, 'wb') as f:
+            f.write(similarity.COMPILED_HEADER_V1.pack(
+                fields[0], 1, *fields[2:-1]))
+            f.write(data[similarity.COMPILED_HEADER.size:])
+
+        index = SimilarityIndex.load(path)
+        self.assertEqual(index.normalization, similarity.NORMALIZE_LOWER)
+        self.assertEqual(list(index.words), ['dragon'])
+
+
+class SubstringDistanceTests(TestCase):
+
+    def reference(self, needle, haystack):
+        # The row-by-row dynamic program fuzzy_substring used to run.
+        m, n = len(needle), len(haystack)
+        if m == 1 and needle not in haystack:
+            return -1
+        if n == 0:
+            return m
+        row1 = [0] * (n + 1)
+        for i in range(m):
+            row2 = [i + 1]
+            for j in range(n):
+                cost = 1 if needle[i] != haystack[j] else 0
+                row2.append(min(row1[j + 1] + 1, row2[j] + 1, row1[j] + cost))
+            row1 = row2
+        return min(row1)
+
+    def test_matches_reference_dynamic_program(self):
+        rng = random.Random(42)
+        for _ in range(2000):
+            needle = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 12)))
+            haystack = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 70)))
+            self.assertEqual(substring_distance(needle, haystack),
+                             self.reference(needle, haystack),
+                             (needle, haystack))
+
+    def test_limit_cuts_off_distant_haystacks(self):
+        rng = random.Random(7)
+        for _ in range(500):
+            needle = ''.join(rng.choice('abc') for _ in range(rng.randint(2, 10)))
+            haystack = ''.join(rng.choice('abc') for _ in range(rng.randint(1, 10)))
+            limit = rng.randint(0, 4)
+            expected = self.reference(needle, haystack)
+            self.assertEqual(
+                substring_distance(needle, haystack, limit=limit),
+                expected if expected <= limit else limit + 1)
+
+
+class ValidateManyTests(TestCase):
+
+    def test_pool_matches_serial_validation(self):
+        chain = [
+            validators.LengthValidator(min_length=8),
+            validators.CommonSequenceValidator(validators.COMMON_SEQUENCES),
+            validators.DictionaryValidator(words=['dragon', 'monkey']),
+            validators.ComplexityValidator(dict(DIGITS=1)),
+        ]
+        values = ['short', 'dragon123', 'qwertyuiop', 'Correct horse 9',
+                  'monkeys!', 'aB3$fg7&kL']
+
+        def summarize(results):
+            return [(i, [(e.code, e.messages) for e in errors])
+                    for i, errors in results]
+
+        serial = summarize(validators.validate_many(values, chain,
+                                                    processes=0))
+        pooled = summarize(validators.validate_many(values, chain,
+                                                    processes=2,
+                                                    chunksize=2,
+                                                    start_method='fork'))
+        self.assertEqual(serial, pooled)
+        self.assertEqual([i for i, _ in serial], list(range(len(values))))
+        self.assertEqual(serial[0][1][0][0], 'length')
+        self.assertEqual(serial[3][1], [])
+
+    def test_field_and_bulk_defaults_agree(self):
+        from passwords.fields import PasswordField
+        from passwords.policy import default_policy
+        self.assertEqual(list(PasswordField.default_validators),
+                         [default_policy])
+        self.assertEqual(set(default_policy.validators),
+                         set(validators.default_validators))
+
+
+class BreachedPasswordValidatorTests(ValidatorTestCase):
+
+    def mkcorpus(self, passwords, **kwargs):
+        lines = [binascii.hexlify(password_hash(p)).upper() + b':12'
+                 for p in passwords]
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'breached.bin')
+        compile_corpus(lines, path, **kwargs)
+        return path
+
+    def test_rejects_breached_passwords(self):
+        path = self.mkcorpus(['password1', 'letmein', 'Tr0ub4dor&3'])
+        bv = validators.BreachedPasswordValidator(corpus=path)
+        self.assertInvalid(bv, 'letmein', 'breached')
+        self.assertInvalid(bv, 'Tr0ub4dor&3', 'breached')
+        self.assertValid(bv, 'LETMEIN')
+        self.assertValid(bv, 'correct horse battery staple')
+
+    def test_unsorted_input_and_truncated_hashes(self):
+        passwords = ['pw%d' % i for i in range(500)]
+        path = self.mkcorpus(passwords + passwords[:50], hash_bytes=8,
+                             chunk_size=16, fan_in=3)
+        corpus = BreachCorpus(path)
+        self.assertEqual(len(corpus), 500)
+        for p in passwords:
+            self.assertIn(p, corpus)
+        self.assertNotIn('pw500', corpus)
+
+    def test_no_corpus_configured(self):
+        self.assertValid(validators.BreachedPasswordValidator(), 'letmein')
+
+
+class CommonSequenceValidatorTests(ValidatorTestCase):
+
+    def test_whole_password_similarity(self):
+        cv = validators.CommonSequenceValidator(validators.COMMON_SEQUENCES)
+        self.assertInvalid(cv, 'qwertyuiop', 'common sequence')
+        self.assertInvalid(cv, 'ABCDEFGH', 'common sequence')
+        self.assertValid(cv, 'x9876yq!kz')
+
+    def test_min_run_detects_embedded_and_reversed_runs(self):
+        cv = validators.CommonSequenceValidator(validators.COMMON_SEQUENCES,
+                                                min_run=4)
+        self.assertInvalid(cv, 'x9876yq!kz', 'common sequence')
+        self.assertInvalid(cv, 'MyLongPassphraseAsdfEnds', 'common sequence')
+        self.assertInvalid(cv, 'zyxw-horse-battery', 'common sequence')
+        self.assertValid(cv, 'x987yq!kz')
+        self.assertEqual(cv.find_match('horse4321staple'), '4321')
+
+    def test_min_run_honors_custom_sequences(self):
+        cv = validators.CommonSequenceValidator(['MNOP'], min_run=3)
+        self.assertInvalid(cv, 'abc-pon-xyz')
+        self.assertValid(cv, 'abc-xyz-123')
+
+
+class User(object):
+
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+
+class UserAttributeSimilarityValidatorTests(ValidatorTestCase):
+
+    def setUp(self):
+        self.user = User(username='ripley', email='ellen.ripley@weyland.com',
+                         first_name='Ellen', last_name='Ripley-Lambert')
+        self.validator = validators.UserAttributeSimilarityValidator(
+            threshold=0.8).for_user(self.user)
+
+    def test_rejects_passwords_like_user_attributes(self):
+        for password in ('Ripley!', 'ELLEN.RIPLEY', 'ripleylambert',
+                         'Lambert1'):
+            self.assertInvalid(self.validator, password)
+        self.assertInvalid(self.validator, 'ripley1', 'your username')
+        self.assertValid(self.validator, 'Nostromo 180924609')
+        self.assertValid(self.validator, 'weyland yutani corp')
+
+    def test_without_user(self):
+        validator = validators.UserAttributeSimilarityValidator()
+        validator('ripley')
+        validator.for_user(None)('ripley')
+
+    def test_tokens_are_computed_once_per_user(self):
+        first = validators.user_tokens(self.user)
+        self.assertIn(('email', 'ellen.ripley'), first)
+        self.assertIn(('last_name', 'lambert'), first)
+        self.assertNotIn(('email', 'weyland'), first)
+        self.assertIs(validators.user_tokens(self.user), first)
+
+        self.user.username = 'newt'
+        self.assertIn(('username', 'newt'), validators.user_tokens(self.user))
+        self.assertInvalid(self.validator, 'newt!')
@@ -0,0 +1,70 @@
+# -*- coding: utf8 -*-
+
+from __future__ import unicode_literals
+import os
+import random
+import subprocess
+import sys
+from passwords import validators, vectorized
+from passwords.similarity import SimilarityIndex, substring_distance
+from unittest import TestCase, skipIf
+
+
+@skipIf(not vectorized.available(), 'NumPy is not installed')
+class VectorizedBackendTests(TestCase):
+
+    def random_words(self, rng, count, alphabet='abcdeXYZ12é'):
+        return [''.join(rng.choice(alphabet)
+                        for _ in range(rng.randint(1, 14)))
+                for _ in range(count)]
+
+    def test_distances_match_bit_parallel(self):
+        rng = random.Random(4321)
+        index = SimilarityIndex.from_haystacks(self.random_words(rng, 400))
+        matrices = vectorized.matrices_for(index)
+        for length, start, stop in index.lengths:
+            rows = matrices.rows(start)
+            for _ in range(10):
+                needle = ''.join(rng.choice('abcdexyz12é')
+                                 for _ in range(rng.randint(2, 16)))
+                expected = [substring_distance(needle, index.words[i])
+                            for i in range(start, stop)]
+                self.assertEqual(
+                    list(vectorized.substring_distances(needle, rows)),
+                    expected)
+                limit = rng.randint(0, 4)
+                expected = [substring_distance(needle, index.words[i],
+                                               limit=limit)
+                            for i in range(start, stop)]
+                self.assertEqual(
+                    list(vectorized.substring_distances(needle, rows, limit)),
+                    expected)
+
+    def test_backends_find_the_same_match(self):
+        rng = random.Random(99)
+        words = self.random_words(rng, 3000)
+        for threshold in (0.5, 0.75, 0.9):
+            numpy_dv = validators.DictionaryValidator(words=words,
+                                                      threshold=threshold)
+            numpy_dv.backend = 'numpy'
+            python_dv = validators.DictionaryValidator(words=words,
+                                                       threshold=threshold)
+            python_dv.backend = 'python'
+            for _ in range(50):
+                value = ''.join(rng.choice('abcdeXYZ12')
+                                for _ in range(rng.randint(2, 20)))
+                self.assertEqual(numpy_dv.find_match(value),
+                                 python_dv.find_match(value),
+                                 (value, threshold))
+        self.assertGreater(numpy_dv.get_index().matrices.nbytes, 0)
+
+
+class LazyImportTests(TestCase):
+
+    def test_importing_the_validators_does_not_import_numpy(self):
+        code = ('import tests, sys, passwords.fields; '
+                'print("numpy" in sys.modules)')
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.check_output([sys.executable, '-c', code],
+                                         cwd=root)
+        self.assertEqual(output.strip(), b'False')
@@ -0,0 +1,58 @@
+# -*- coding: utf8 -*-
+
+from __future__ import unicode_literals
+import json
+from django.test import RequestFactory
+from passwords import policy, validators, views
+from unittest import TestCase
+
+
+class ValidatePasswordViewTests(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.session = {}
+        self.dictionary = validators.DictionaryValidator(
+            words=['nostromo', 'sulaco', 'narcissus'], threshold=0.8)
+        self.old_policy = policy.default_policy
+        policy.default_policy = policy.PasswordPolicy(
+            [validators.LengthValidator(min_length=6), self.dictionary])
+
+    def tearDown(self):
+        policy.default_policy = self.old_policy
+        views.states.clear()
+
+    def post(self, password):
+        request = self.factory.post('/validate/', {'password': password})
+        request.session = self.session
+        response = views.validate_password(request)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content.decode('utf-8'))
+
+    def test_reports_errors_as_the_password_is_typed(self):
+        self.assertEqual(self.post('zx')['codes'], ['length'])
+        result = self.post('nostro')
+        self.assertEqual(result['codes'], ['dictionary_word'])
+        self.assertFalse(result['valid'])
+        self.assertEqual(self.post('Nostromo!')['codes'], ['dictionary_word'])
+        result = self.post('Nostromo! 1979 Weyland')
+        self.assertEqual(result, {'valid': True, 'errors': [], 'codes': []})
+
+    def test_scans_advance_within_a_session(self):
+        self.post('xnostromo1')
+        self.post('xnostromo12')
+        lock, scans = views.states.get(self.session[views.SESSION_KEY])
+        scan = scans[self.dictionary]
+        self.assertEqual(scan.needle, 'xnostromo12')
+
+        # Another session gets its own state.
+        session, self.session = self.session, {}
+        self.post('sula')
+        self.assertNotEqual(self.session[views.SESSION_KEY],
+                            session[views.SESSION_KEY])
+        self.assertEqual(scan.needle, 'xnostromo12')
+
+    def test_requires_post(self):
+        request = self.factory.get('/validate/', {'password': 'nostromo'})
+        request.session = self.session
+        self.assertEqual(views.validate_password(request).status_code, 405)